@@ -1,9 +1,13 @@
 """SuperImage GUI Application Entry Point."""
 
 import sys
-from pathlib import Path
+from functools import cache
+from PySide6.QtGui import QPixmapCache
 from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QFile, QIODevice, QThreadPool, QTimer
+
+# Imported for its side effect: registers the :/styles and :/icons resources
+import src.resources_rc
 
 # Set high DPI scaling
 QApplication.setHighDpiScaleFactorRoundingPolicy(
@@ -11,6 +15,18 @@ QApplication.setHighDpiScaleFactorRoundingPolicy(
 )
 
 
+@cache
+def _load_stylesheet() -> str:
+    """Read the liquid glass stylesheet from the compiled resources once per process."""
+    style_file = QFile(":/styles/liquid_glass.qss")
+    if not style_file.open(QIODevice.OpenModeFlag.ReadOnly | QIODevice.OpenModeFlag.Text):
+        return ""
+    try:
+        return bytes(style_file.readAll()).decode("utf-8")
+    finally:
+        style_file.close()
+
+
 def main():
     """Main application entry point."""
     app = QApplication(sys.argv)
@@ -20,11 +36,8 @@ def main():
     app.setOrganizationName("SuperImage")
     app.setApplicationDisplayName("SuperImage - Image Upscaler")
 
-    # Load and apply stylesheet
-    style_path = Path(__file__).parent / "src" / "ui" / "styles" / "liquid_glass.qss"
-    if style_path.exists():
-        with open(style_path, "r", encoding="utf-8") as f:
-            app.setStyleSheet(f.read())
+    # Room for a few scaled previews next to the list thumbnails (limit is in KiB)
+    QPixmapCache.setCacheLimit(20 * 1024)
 
     # Create and show main window
     from src.ui.main_window import MainWindow
@@ -32,6 +45,13 @@ def main():
     window = MainWindow()
     window.show()
 
+    # Apply the stylesheet from the event loop so reading it doesn't delay the first paint
+    QTimer.singleShot(0, lambda: app.setStyleSheet(_load_stylesheet()))
+
+    # Warm up the torch import and GPU probe in the background so the first
+    # upscale starts quickly and the settings dialog never touches CUDA
+    QThreadPool.globalInstance().start(window.processor.warm_up)
+
     sys.exit(app.exec())
 
 
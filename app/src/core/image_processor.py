@@ -1,152 +1,365 @@
 """Image processor for handling upscaling operations."""
 
+from __future__ import annotations
+
+import queue
 import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
-from PySide6.QtCore import QObject, Signal, QThread, QSettings
+from types import ModuleType
+from typing import TYPE_CHECKING, Optional
+from PIL import Image
+from PySide6.QtCore import QObject, QRunnable, QSettings, QThreadPool, Signal
+
+if TYPE_CHECKING:
+    from scripts.src.models.real_esrgan import RealESRGANUpscaler
 
-# Add project root to path for importing
+# Project root, added to the import path when the upscaler is first needed
 project_root = Path(__file__).parent.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
 
-from scripts.src.models.real_esrgan import RealESRGANUpscaler  # noqa: E402
+# Minimum seconds between batch progress updates (about 30 per second)
+PROGRESS_INTERVAL = 1 / 30
+
+
+def load_upscaler_module() -> ModuleType:
+    """Import the Real-ESRGAN module, which pulls in torch, on first use.
+
+    Safe to call from any thread, so the import can be warmed up in the
+    background while the window is already on screen.
+    """
+    if str(project_root) not in sys.path:
+        sys.path.insert(0, str(project_root))
+
+    from scripts.src.models import real_esrgan
+
+    return real_esrgan
+
+
+@dataclass(frozen=True, slots=True)
+class UpscaleConfig:
+    """Upscaling settings, parsed once from QSettings."""
+
+    model: str
+    output_dir: str
+    tile: int  # 0 means automatic tiling
+    tile_pad: int
+    pre_pad: int
+    outscale: float
+    precision: str
+
+    @classmethod
+    def from_settings(cls, settings: QSettings) -> UpscaleConfig:
+        """Read and convert all upscaling settings."""
+        return cls(
+            model=settings.value("model", "RealESRGAN_x4plus"),
+            output_dir=settings.value("output_dir", str(Path.cwd() / "output")),
+            tile=int(settings.value("tile", 384)),
+            tile_pad=int(settings.value("tile_pad", 16)),
+            pre_pad=int(settings.value("pre_pad", 0)),
+            outscale=float(settings.value("outscale", 4.0)),
+            precision=settings.value("precision", "FP16"),
+        )
+
+
+def group_by_size(input_paths: list[str], upscaler: RealESRGANUpscaler) -> list[list[str]]:
+    """Group same-size RGB images into batches the upscaler can run in one pass.
+
+    Only image headers are read; anything that is not plain RGB, or has no
+    same-size partner, ends up in a batch of one.
+    """
+    sizes: dict[tuple[int, int], list[str]] = {}
+    batches = []
+    for input_path in input_paths:
+        try:
+            with Image.open(input_path) as image:
+                size, mode = image.size, image.mode
+        except (OSError, Image.DecompressionBombError):
+            # Unreadable headers and images over Pillow's pixel limit go alone
+            size, mode = None, None
+
+        if mode == "RGB":
+            sizes.setdefault(size, []).append(input_path)
+        else:
+            batches.append([input_path])
+
+    for (width, height), paths in sizes.items():
+        batch_size = upscaler.max_batch_size(height, width)
+        batches.extend(paths[i:i + batch_size] for i in range(0, len(paths), batch_size))
+    return batches
+
+
+class _Prefetcher:
+    """Decode the next group of images while the current group is upscaled.
+
+    Each upscaler thread owns one prefetcher, so at most one decoded group per
+    device waits in memory and disk reads overlap with GPU time.
+    """
+
+    def __init__(
+        self,
+        pending: queue.SimpleQueue,
+        executor: ThreadPoolExecutor,
+        read_images: Callable[[list[str]], list],
+    ):
+        self.pending = pending
+        self.executor = executor
+        self.read_images = read_images
+        self._next = self._submit()
+
+    def _submit(self) -> Optional[tuple[list[str], Future]]:
+        """Take the next group off the queue and start decoding it."""
+        try:
+            group = self.pending.get_nowait()
+        except queue.Empty:
+            return None
+        return group, self.executor.submit(self.read_images, group)
+
+    def next(self) -> Optional[tuple[list[str], list]]:
+        """Get the next group with its decoded images, or None when the queue is empty."""
+        current = self._next
+        if current is None:
+            return None
+        self._next = self._submit()
+        group, future = current
+        return group, future.result()
+
+
+class CancellableWorker(QRunnable):
+    """Base for thread pool workers that can be asked to stop early."""
+
+    def __init__(self):
+        super().__init__()
+        # The processor keeps a reference, so the pool must not delete the worker
+        self.setAutoDelete(False)
+        self._cancel = threading.Event()
 
+    def cancel(self):
+        """Ask the worker to stop at its next checkpoint."""
+        self._cancel.set()
 
-class UpscaleWorker(QThread):
-    """Worker thread for running upscale operations."""
+    def is_cancelled(self) -> bool:
+        """Check if the worker was asked to stop."""
+        return self._cancel.is_set()
+
+
+class UpscaleSignals(QObject):
+    """Signals emitted by UpscaleWorker."""
 
     progress = Signal(int, str)
     finished = Signal(bool, str)
     error = Signal(str)
 
+
+class UpscaleWorker(CancellableWorker):
+    """Thread pool worker for running upscale operations."""
+
     def __init__(
         self,
         input_path: str,
         output_path: str,
-        model_name: str,
-        tile: int,
-        tile_pad: int,
-        pre_pad: int,
+        get_upscalers: Callable[[], list[RealESRGANUpscaler]],
         outscale: float,
     ):
         super().__init__()
+        self.signals = UpscaleSignals()
         self.input_path = input_path
         self.output_path = output_path
-        self.model_name = model_name
-        self.tile = tile
-        self.tile_pad = tile_pad
-        self.pre_pad = pre_pad
+        self.get_upscalers = get_upscalers
         self.outscale = outscale
 
     def run(self):
         """Run the upscaling operation."""
         try:
-            self.progress.emit(10, f"Initializing {self.model_name}...")
+            # Built here so importing torch and probing CUDA stay off the GUI thread
+            upscaler = self.get_upscalers()[0]
+            upscaler.is_cancelled = self.is_cancelled
+            self.signals.progress.emit(10, f"Loading {upscaler.model_name}...")
 
-            upscaler = RealESRGANUpscaler(
-                model_name=self.model_name,
-                tile=self.tile,
-                tile_pad=self.tile_pad,
-                pre_pad=self.pre_pad,
-            )
+            # Pay model loading and CUDA/cuDNN setup before the progress jump
+            upscaler.warmup()
+            self.signals.progress.emit(30, "Upscaling image...")
 
-            self.progress.emit(30, "Loading model...")
+            if self.is_cancelled():
+                self.signals.progress.emit(0, "Upscaling cancelled")
+                self.signals.finished.emit(False, "")
+                return
 
             success = upscaler.upscale(
                 input_path=self.input_path,
                 output_path=self.output_path,
                 outscale=self.outscale,
             )
-
-            upscaler.cleanup()
-
-            if success:
-                self.progress.emit(100, "Upscaling completed!")
-                self.finished.emit(True, self.output_path)
+            upscaler.release_memory()
+
+            if self.is_cancelled():
+                # Stopped between tile batches, e.g. because the window is closing
+                self.signals.progress.emit(0, "Upscaling cancelled")
+                self.signals.finished.emit(False, "")
+            elif success:
+                self.signals.progress.emit(100, "Upscaling completed!")
+                self.signals.finished.emit(True, self.output_path)
             else:
-                self.error.emit("Upscaling failed")
-                self.finished.emit(False, "")
+                self.signals.error.emit("Upscaling failed")
+                self.signals.finished.emit(False, "")
 
         except Exception as e:
-            self.error.emit(f"Error: {str(e)}")
-            self.finished.emit(False, "")
+            self.signals.error.emit(f"Error: {str(e)}")
+            self.signals.finished.emit(False, "")
 
 
-class BatchUpscaleWorker(QThread):
-    """Worker thread for batch upscaling operations."""
+class BatchUpscaleSignals(QObject):
+    """Signals emitted by BatchUpscaleWorker."""
 
     progress = Signal(int, str)
     finished = Signal(int, int, list)  # success_count, total, failed_files
     error = Signal(str)
 
+
+class BatchUpscaleWorker(CancellableWorker):
+    """Thread pool worker for batch upscaling operations.
+
+    Same-size images are grouped so they can share one forward pass, and the
+    next group is decoded in the background while the current one runs. Groups
+    are pulled from a shared queue by one thread per upscaler, so on
+    multi-GPU machines each device processes images as fast as it can and
+    the faster device naturally takes more of the batch. Once the worker is
+    cancelled, each thread stops pulling new images and abandons the one in
+    progress after its current tile batch.
+    """
+
     def __init__(
         self,
         input_paths: list[str],
         output_dir: str,
-        model_name: str,
-        tile: int,
-        tile_pad: int,
-        pre_pad: int,
+        get_upscalers: Callable[[], list[RealESRGANUpscaler]],
         outscale: float,
     ):
         super().__init__()
+        self.signals = BatchUpscaleSignals()
         self.input_paths = input_paths
         self.output_dir = output_dir
-        self.model_name = model_name
-        self.tile = tile
-        self.tile_pad = tile_pad
-        self.pre_pad = pre_pad
+        self.get_upscalers = get_upscalers
         self.outscale = outscale
 
     def run(self):
         """Run batch upscaling operations."""
+        total = len(self.input_paths)
+        success_count = 0
+        failed_files: list[str] = []
+        processed: set[str] = set()
         try:
-            total = len(self.input_paths)
-            success_count = 0
-            failed_files = []
-
-            self.progress.emit(0, f"Initializing {self.model_name}...")
-
-            upscaler = RealESRGANUpscaler(
-                model_name=self.model_name,
-                tile=self.tile,
-                tile_pad=self.tile_pad,
-                pre_pad=self.pre_pad,
-            )
-
+            started = 0
+            completed = 0
+            lock = threading.Lock()
+            last_emit = 0.0
+
+            # Bind attributes used for every image to locals once
+            input_paths = self.input_paths
+            outscale = self.outscale
+            is_cancelled = self.is_cancelled
+            emit_progress = self.signals.progress.emit
+
+            # Work out names and output paths up front so the loop only does lookups
             output_dir_path = Path(self.output_dir)
-            output_dir_path.mkdir(parents=True, exist_ok=True)
-
-            for idx, input_path in enumerate(self.input_paths):
+            file_names = {}
+            output_paths = {}
+            for input_path in input_paths:
                 input_file = Path(input_path)
-                output_file = output_dir_path / f"{input_file.stem}_upscaled{input_file.suffix}"
-
-                current_progress = int((idx / total) * 100)
-                self.progress.emit(
-                    current_progress,
-                    f"Processing {idx + 1}/{total}: {input_file.name}",
-                )
-
-                success = upscaler.upscale(
-                    input_path=input_path,
-                    output_path=str(output_file),
-                    outscale=self.outscale,
+                file_names[input_path] = input_file.name
+                output_paths[input_path] = str(
+                    output_dir_path / f"{input_file.stem}_upscaled{input_file.suffix}"
                 )
 
-                if success:
-                    success_count += 1
+            # Built here so importing torch and probing CUDA stay off the GUI thread
+            upscalers = self.get_upscalers()
+            for upscaler in upscalers:
+                upscaler.is_cancelled = is_cancelled
+            emit_progress(0, f"Initializing {upscalers[0].model_name}...")
+
+            pending = queue.SimpleQueue()
+            for group in group_by_size(input_paths, upscalers[0]):
+                pending.put(group)
+
+            def process_queue(upscaler: RealESRGANUpscaler, executor: ThreadPoolExecutor):
+                nonlocal success_count, started, completed, last_emit
+                prefetcher = _Prefetcher(pending, executor, upscaler.read_images)
+                while not is_cancelled():
+                    prefetched = prefetcher.next()
+                    if prefetched is None:
+                        return
+                    group, images = prefetched
+
+                    names = [file_names[input_path] for input_path in group]
+                    output_files = [output_paths[input_path] for input_path in group]
+
+                    with lock:
+                        started += len(group)
+                        now = time.monotonic()
+                        if now - last_emit >= PROGRESS_INTERVAL or started == total:
+                            last_emit = now
+                            emit_progress(
+                                int((completed / total) * 100),
+                                f"Processing {started}/{total}: {names[0]}",
+                            )
+
+                    try:
+                        if len(group) == 1:
+                            results = [
+                                images[0] is not None
+                                and upscaler.upscale_image(images[0], output_files[0], outscale=outscale)
+                            ]
+                        else:
+                            results = upscaler.upscale_many(
+                                group, output_files, outscale=outscale, images=images
+                            )
+                    except Exception:
+                        # Report the group in failed_files instead of losing it with this thread
+                        results = [False] * len(group)
+
+                    with lock:
+                        completed += len(group)
+                        processed.update(group)
+                        for name, success in zip(names, results, strict=True):
+                            if success:
+                                success_count += 1
+                            else:
+                                failed_files.append(name)
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                if len(upscalers) == 1:
+                    process_queue(upscalers[0], executor)
                 else:
-                    failed_files.append(input_file.name)
-
-            upscaler.cleanup()
-
-            self.progress.emit(100, "Batch processing completed!")
-            self.finished.emit(success_count, total, failed_files)
+                    threads = [
+                        threading.Thread(target=process_queue, args=(upscaler, executor), daemon=True)
+                        for upscaler in upscalers
+                    ]
+                    for thread in threads:
+                        thread.start()
+                    for thread in threads:
+                        thread.join()
+
+            if is_cancelled():
+                # Free VRAM right away; the models reload lazily on the next run
+                for upscaler in upscalers:
+                    upscaler.cleanup()
+                emit_progress(int((completed / total) * 100), "Batch processing cancelled")
+            else:
+                for upscaler in upscalers:
+                    upscaler.release_memory()
+                emit_progress(100, "Batch processing completed!")
+            self.signals.finished.emit(success_count, total, failed_files)
 
         except Exception as e:
-            self.error.emit(f"Batch processing error: {str(e)}")
-            self.finished.emit(0, len(self.input_paths), [f.name for f in [Path(p) for p in self.input_paths]])
+            self.signals.error.emit(f"Batch processing error: {str(e)}")
+            # Images that never finished count as failed alongside the ones that did fail
+            failed_files.extend(
+                Path(input_path).name for input_path in self.input_paths if input_path not in processed
+            )
+            self.signals.finished.emit(success_count, total, failed_files)
 
 
 class ImageProcessor(QObject):
@@ -160,67 +373,154 @@ class ImageProcessor(QObject):
     def __init__(self):
         super().__init__()
         self.settings = QSettings("SuperImage", "SuperImageApp")
-        self.worker: Optional[QThread] = None
-
-    def get_settings(self) -> dict:
-        """Get current settings."""
-        return {
-            "model": self.settings.value("model", "RealESRGAN_x4plus"),
-            "output_dir": self.settings.value("output_dir", str(Path.cwd() / "output")),
-            "tile": int(self.settings.value("tile", 400)),
-            "tile_pad": int(self.settings.value("tile_pad", 10)),
-            "pre_pad": int(self.settings.value("pre_pad", 0)),
-            "outscale": float(self.settings.value("outscale", 4.0)),
-        }
+        self.worker: Optional[CancellableWorker] = None
+
+        # A single long-lived pool thread runs every operation
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.pool.setExpiryTimeout(-1)
+        self._upscalers: list[RealESRGANUpscaler] = []
+        self._upscaler_key: Optional[tuple] = None
+        self._last_output_dir: Optional[str] = None
+        self._config: Optional[UpscaleConfig] = None
+        # Whether the GPU runs bfloat16, or None until warm_up() has checked
+        self.bf16_supported: Optional[bool] = None
+
+    def warm_up(self):
+        """Import torch and probe the GPU's capabilities; meant for a background thread.
+
+        Probing BF16 support creates the CUDA context, which would stall the
+        GUI thread, so the result is cached here for the settings dialog.
+        """
+        self.bf16_supported = load_upscaler_module().bf16_supported()
+
+    def get_settings(self) -> UpscaleConfig:
+        """Get current settings.
+
+        Settings are read from QSettings once and cached until
+        invalidate_settings() is called.
+        """
+        if self._config is None:
+            self._config = UpscaleConfig.from_settings(self.settings)
+        return self._config
+
+    def invalidate_settings(self):
+        """Drop the cached settings so the next operation reads them again."""
+        self._config = None
+
+    def _get_upscalers(self, config: UpscaleConfig) -> list[RealESRGANUpscaler]:
+        """Get one cached upscaler per device, rebuilding them when the config changes.
+
+        Only called from the worker thread, as it imports torch and probes
+        CUDA; the single pool thread also serializes access to the cache.
+        Models load lazily on first use, so idle devices never load weights.
+        """
+        key = (config.model, config.tile, config.tile_pad, config.pre_pad, config.precision)
+        if not self._upscalers or self._upscaler_key != key:
+            self._release_upscalers()
+            real_esrgan = load_upscaler_module()
+            precision = config.precision
+            if precision == "BF16" and not real_esrgan.bf16_supported():
+                # Chosen before support was known, or settings copied from another machine
+                precision = "FP16"
+            self._upscalers = [
+                real_esrgan.RealESRGANUpscaler(
+                    model_name=config.model,
+                    device=device,
+                    torch_dtype=real_esrgan.PRECISION_DTYPES[precision],
+                    tile=config.tile or real_esrgan.AUTO_TILE,
+                    tile_pad=config.tile_pad,
+                    pre_pad=config.pre_pad,
+                )
+                for device in real_esrgan.get_available_devices()
+            ]
+            self._upscaler_key = key
+        return self._upscalers
+
+    def _release_upscalers(self):
+        """Free the models held by the cached upscalers."""
+        for upscaler in self._upscalers:
+            upscaler.cleanup()
+        self._upscalers = []
+        self._upscaler_key = None
+
+    def _ensure_output_dir(self, output_dir: str) -> bool:
+        """Create the output directory, skipping the mkdir when it hasn't changed.
+
+        Returns:
+            True if the directory exists, False after emitting error
+        """
+        if output_dir != self._last_output_dir:
+            try:
+                Path(output_dir).mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                self.error.emit(f"Cannot create output directory {output_dir}: {e}")
+                return False
+            self._last_output_dir = output_dir
+        return True
 
     def upscale_single(self, input_path: str, output_path: str):
         """Upscale a single image."""
-        if self.worker and self.worker.isRunning():
+        if self.is_busy():
             self.error.emit("Another operation is already running")
             return
 
-        settings = self.get_settings()
+        config = self.get_settings()
+        if not self._ensure_output_dir(str(Path(output_path).parent)):
+            return
 
         self.worker = UpscaleWorker(
             input_path=input_path,
             output_path=output_path,
-            model_name=settings["model"],
-            tile=settings["tile"],
-            tile_pad=settings["tile_pad"],
-            pre_pad=settings["pre_pad"],
-            outscale=settings["outscale"],
+            get_upscalers=lambda: self._get_upscalers(config),
+            outscale=config.outscale,
         )
 
-        self.worker.progress.connect(self.progress.emit)
-        self.worker.finished.connect(self.single_finished.emit)
-        self.worker.error.connect(self.error.emit)
+        self.worker.signals.progress.connect(self.progress.emit)
+        self.worker.signals.finished.connect(self.single_finished.emit)
+        self.worker.signals.error.connect(self.error.emit)
 
-        self.worker.start()
+        self.pool.start(self.worker)
 
     def upscale_batch(self, input_paths: list[str]):
         """Upscale multiple images."""
-        if self.worker and self.worker.isRunning():
+        if self.is_busy():
             self.error.emit("Another operation is already running")
             return
 
-        settings = self.get_settings()
+        config = self.get_settings()
+        if not self._ensure_output_dir(config.output_dir):
+            return
 
         self.worker = BatchUpscaleWorker(
             input_paths=input_paths,
-            output_dir=settings["output_dir"],
-            model_name=settings["model"],
-            tile=settings["tile"],
-            tile_pad=settings["tile_pad"],
-            pre_pad=settings["pre_pad"],
-            outscale=settings["outscale"],
+            output_dir=config.output_dir,
+            get_upscalers=lambda: self._get_upscalers(config),
+            outscale=config.outscale,
         )
 
-        self.worker.progress.connect(self.progress.emit)
-        self.worker.finished.connect(self.batch_finished.emit)
-        self.worker.error.connect(self.error.emit)
+        self.worker.signals.progress.connect(self.progress.emit)
+        self.worker.signals.finished.connect(self.batch_finished.emit)
+        self.worker.signals.error.connect(self.error.emit)
 
-        self.worker.start()
+        self.pool.start(self.worker)
 
     def is_busy(self) -> bool:
         """Check if processor is currently running."""
-        return self.worker is not None and self.worker.isRunning()
+        return self.pool.activeThreadCount() > 0
+
+    def cancel(self):
+        """Ask the running operation to stop after the current image."""
+        if self.is_busy():
+            self.worker.cancel()
+
+    def is_cancelled(self) -> bool:
+        """Check if cancellation was requested for the current operation."""
+        return self.worker is not None and self.worker.is_cancelled()
+
+    def shutdown(self):
+        """Stop any running operation and release the cached model."""
+        self.cancel()
+        self.pool.waitForDone()
+
+        self._release_upscalers()
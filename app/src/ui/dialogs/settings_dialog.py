@@ -1,7 +1,8 @@
 """Settings dialog for model and output directory selection."""
 
 from pathlib import Path
-from PySide6.QtCore import QSettings
+from typing import Optional
+from PySide6.QtCore import QSettings, Signal
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -19,13 +20,27 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+# Tile sizes and paddings snap to these multiples so tiles stay kernel-aligned
+TILE_STEP = 32
+TILE_PAD_STEP = 8
+
 
 class SettingsDialog(QDialog):
     """Dialog for configuring application settings."""
 
-    def __init__(self, parent=None):
+    settings_saved = Signal()
+
+    def __init__(self, parent=None, bf16_supported: Optional[bool] = None):
+        """Create the dialog.
+
+        Args:
+            parent: Parent widget
+            bf16_supported: Whether the GPU runs bfloat16; None if not known yet,
+                which leaves BF16 selectable
+        """
         super().__init__(parent)
         self.settings = QSettings("SuperImage", "SuperImageApp")
+        self.bf16_supported = bf16_supported
         self.setup_ui()
         self.load_settings()
 
@@ -117,10 +132,13 @@ class SettingsDialog(QDialog):
         self.output_dir_edit.setText(output_dir)
 
         # Load advanced settings
-        self.tile_spin.setValue(int(self.settings.value("tile", 400)))
-        self.tile_pad_spin.setValue(int(self.settings.value("tile_pad", 10)))
+        self.tile_spin.setValue(int(self.settings.value("tile", 384)))
+        self.tile_pad_spin.setValue(int(self.settings.value("tile_pad", 16)))
         self.pre_pad_spin.setValue(int(self.settings.value("pre_pad", 0)))
         self.outscale_spin.setValue(float(self.settings.value("outscale", 4.0)))
+        index = self.precision_combo.findData(self.settings.value("precision", "FP16"))
+        if index >= 0 and self.precision_combo.model().item(index).isEnabled():
+            self.precision_combo.setCurrentIndex(index)
 
     def save_and_accept(self):
         """Save settings and close dialog."""
@@ -130,6 +148,8 @@ class SettingsDialog(QDialog):
         self.settings.setValue("tile_pad", self.tile_pad_spin.value())
         self.settings.setValue("pre_pad", self.pre_pad_spin.value())
         self.settings.setValue("outscale", self.outscale_spin.value())
+        self.settings.setValue("precision", self.precision_combo.currentData())
+        self.settings_saved.emit()
         self.accept()
 
     def browse_output_dir(self):
@@ -155,9 +175,18 @@ class SettingsDialog(QDialog):
         self.tile_spin = QSpinBox()
         self.tile_spin.setObjectName("spinBox")
         self.tile_spin.setRange(0, 1024)
-        self.tile_spin.setValue(400)
+        self.tile_spin.setSingleStep(TILE_STEP)
+        self.tile_spin.setKeyboardTracking(False)
+        self.tile_spin.setValue(384)
         self.tile_spin.setSuffix(" px")
-        self.tile_spin.setToolTip("Tile size for processing (0 = no tiling, larger = more VRAM)")
+        self.tile_spin.setSpecialValueText("Auto")
+        self.tile_spin.setToolTip(
+            "Tile size for processing (Auto = largest tile that fits in free VRAM, larger = more VRAM)\n"
+            f"Snapped to multiples of {TILE_STEP} for aligned GPU kernels"
+        )
+        self.tile_spin.valueChanged.connect(
+            lambda: self.snap_to_step(self.tile_spin, TILE_STEP)
+        )
         tile_layout.addWidget(tile_label)
         tile_layout.addWidget(self.tile_spin, stretch=1)
 
@@ -167,10 +196,18 @@ class SettingsDialog(QDialog):
         tile_pad_label.setObjectName("settingLabel")
         self.tile_pad_spin = QSpinBox()
         self.tile_pad_spin.setObjectName("spinBox")
-        self.tile_pad_spin.setRange(0, 50)
-        self.tile_pad_spin.setValue(10)
+        self.tile_pad_spin.setRange(0, 48)
+        self.tile_pad_spin.setSingleStep(TILE_PAD_STEP)
+        self.tile_pad_spin.setKeyboardTracking(False)
+        self.tile_pad_spin.setValue(16)
         self.tile_pad_spin.setSuffix(" px")
-        self.tile_pad_spin.setToolTip("Padding for tiles to reduce seams")
+        self.tile_pad_spin.setToolTip(
+            "Padding for tiles to reduce seams\n"
+            f"Snapped to multiples of {TILE_PAD_STEP} for aligned GPU kernels"
+        )
+        self.tile_pad_spin.valueChanged.connect(
+            lambda: self.snap_to_step(self.tile_pad_spin, TILE_PAD_STEP)
+        )
         tile_pad_layout.addWidget(tile_pad_label)
         tile_pad_layout.addWidget(self.tile_pad_spin, stretch=1)
 
@@ -197,18 +234,47 @@ class SettingsDialog(QDialog):
         self.outscale_spin.setValue(4.0)
         self.outscale_spin.setSingleStep(0.5)
         self.outscale_spin.setSuffix("x")
-        self.outscale_spin.setToolTip("Output upscale factor")
+        self.outscale_spin.setToolTip("Output upscale factor (1x restores the image at its original size)")
         outscale_layout.addWidget(outscale_label)
         outscale_layout.addWidget(self.outscale_spin, stretch=1)
 
+        # Precision
+        precision_layout = QHBoxLayout()
+        precision_label = QLabel("Precision:")
+        precision_label.setObjectName("settingLabel")
+        self.precision_combo = QComboBox()
+        self.precision_combo.setObjectName("precisionComboBox")
+        self.precision_combo.addItem("FP32 (Most compatible)", "FP32")
+        self.precision_combo.addItem("FP16 (Faster, less VRAM)", "FP16")
+        self.precision_combo.addItem("BF16 (Faster, less VRAM, Ampere or newer)", "BF16")
+        self.precision_combo.setCurrentIndex(1)
+        self.precision_combo.setToolTip(
+            "Numeric precision for inference\n"
+            "FP16 and BF16 halve tile VRAM and run faster on Tensor Core GPUs\n"
+            "BF16 falls back to FP16 on GPUs without bfloat16 support"
+        )
+        if self.bf16_supported is False:
+            bf16_index = self.precision_combo.findData("BF16")
+            self.precision_combo.model().item(bf16_index).setEnabled(False)
+        precision_layout.addWidget(precision_label)
+        precision_layout.addWidget(self.precision_combo, stretch=1)
+
         # Add all to group
         group_layout.addLayout(tile_layout)
         group_layout.addLayout(tile_pad_layout)
         group_layout.addLayout(pre_pad_layout)
         group_layout.addLayout(outscale_layout)
+        group_layout.addLayout(precision_layout)
 
         return group
 
+    def snap_to_step(self, spin_box: QSpinBox, step: int):
+        """Round a spin box value to the nearest multiple of step."""
+        value = spin_box.value()
+        snapped = round(value / step) * step
+        if snapped != value:
+            spin_box.setValue(snapped)
+
     def get_model(self) -> str:
         """Get selected model."""
         return self.model_combo.currentData()
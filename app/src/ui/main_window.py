@@ -1,7 +1,7 @@
 """Main window for SuperImage GUI application."""
 
 from pathlib import Path
-from PySide6.QtCore import QSize, QSettings
+from PySide6.QtCore import Qt, QSize, QSettings
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -21,45 +21,28 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.current_input_image = None
         self.settings = QSettings("SuperImage", "SuperImageApp")
+        # Message boxes are reused per (icon, title) instead of rebuilt for every warning
+        self._msg_cache: dict[tuple[QMessageBox.Icon, str], QMessageBox] = {}
         self.setup_ui()
         self.setup_processor()
 
     def create_themed_message_box(self, icon: QMessageBox.Icon, title: str, message: str) -> QMessageBox:
-        """Create a themed QMessageBox."""
-        msg_box = QMessageBox(self)
-        msg_box.setIcon(icon)
-        msg_box.setWindowTitle(title)
+        """Get a themed QMessageBox showing message, reusing one per icon and title."""
+        msg_box = self._msg_cache.get((icon, title))
+        if msg_box is None or msg_box.isVisible():
+            cached = msg_box is None
+            msg_box = QMessageBox(self)
+            msg_box.setIcon(icon)
+            msg_box.setWindowTitle(title)
+            # Dark theme styling comes from the QMessageBox rules in liquid_glass.qss
+            if cached:
+                self._msg_cache[(icon, title)] = msg_box
+            else:
+                # The cached box is still open (e.g. a signal arrived during its exec),
+                # so show this message in a one-off box instead of overwriting it
+                msg_box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+
         msg_box.setText(message)
-        
-        # Apply dark theme styling
-        msg_box.setStyleSheet("""
-            QMessageBox {
-                background-color: rgba(28, 28, 30, 0.95);
-                color: #e5e5e7;
-            }
-            QMessageBox QLabel {
-                color: #e5e5e7;
-                background-color: transparent;
-                font-size: 14px;
-            }
-            QMessageBox QPushButton {
-                background-color: rgba(0, 122, 255, 0.8);
-                color: #ffffff;
-                border: none;
-                border-radius: 10px;
-                padding: 8px 20px;
-                min-width: 70px;
-                font-weight: 600;
-                font-size: 13px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: rgba(10, 132, 255, 0.9);
-            }
-            QMessageBox QPushButton:pressed {
-                background-color: rgba(0, 112, 245, 0.9);
-            }
-        """)
-        
         return msg_box
 
     def setup_ui(self):
@@ -68,7 +51,7 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(QSize(1000, 700))
 
         # Set window icon
-        self.setWindowIcon(QIcon("app/assets/app_icon.png"))
+        self.setWindowIcon(QIcon(":/icons/app_icon.png"))
 
         # Create central widget
         central_widget = QWidget()
@@ -196,11 +179,27 @@ class MainWindow(QMainWindow):
         return self.image_list_widget
 
     def create_progress_bar(self):
-        """Create progress bar for processing."""
+        """Create progress bar and cancel button for processing."""
         from src.ui.widgets.progress_widget import ProgressWidget
 
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(10)
+
         self.progress_widget = ProgressWidget()
-        return self.progress_widget
+
+        cancel_button = QPushButton("✕ Cancel")
+        cancel_button.setObjectName("cancelButton")
+        cancel_button.setMinimumHeight(30)
+        cancel_button.clicked.connect(self.cancel_processing)
+        cancel_button.setEnabled(False)
+        self.cancel_button = cancel_button
+
+        layout.addWidget(self.progress_widget, stretch=1)
+        layout.addWidget(cancel_button, alignment=Qt.AlignmentFlag.AlignBottom)
+
+        return widget
 
     def setup_processor(self):
         """Setup image processor and connect signals."""
@@ -212,6 +211,11 @@ class MainWindow(QMainWindow):
         self.processor.batch_finished.connect(self.on_batch_finished)
         self.processor.error.connect(self.on_error)
 
+    def closeEvent(self, event):
+        """Release the loaded model before the window closes."""
+        self.processor.shutdown()
+        super().closeEvent(event)
+
     def on_image_selected(self, file_path: str):
         """Handle image selection from drop area."""
         self.current_input_image = file_path
@@ -240,17 +244,16 @@ class MainWindow(QMainWindow):
 
         # Get output directory from settings
         output_dir = self.settings.value("output_dir", str(Path.cwd() / "output"))
-        output_dir_path = Path(output_dir)
-        output_dir_path.mkdir(parents=True, exist_ok=True)
 
-        # Generate output path using settings output directory
+        # Generate output path using settings output directory (created by the processor)
         input_path = Path(self.current_input_image)
-        output_path = output_dir_path / f"{input_path.stem}_upscaled{input_path.suffix}"
+        output_path = Path(output_dir) / f"{input_path.stem}_upscaled{input_path.suffix}"
 
         self.single_upscale_button.setEnabled(False)
         self.progress_widget.reset()
 
         self.processor.upscale_single(self.current_input_image, str(output_path))
+        self.cancel_button.setEnabled(self.processor.is_busy())  # Not started if on_error ran
 
     def upscale_batch_images(self):
         """Upscale all images in the batch list."""
@@ -274,6 +277,12 @@ class MainWindow(QMainWindow):
         self.progress_widget.reset()
 
         self.processor.upscale_batch(images)
+        self.cancel_button.setEnabled(self.processor.is_busy())  # Not started if on_error ran
+
+    def cancel_processing(self):
+        """Cancel the running operation after the current image."""
+        self.cancel_button.setEnabled(False)
+        self.processor.cancel()
 
     def on_progress(self, value: int, status: str):
         """Handle progress updates."""
@@ -282,6 +291,10 @@ class MainWindow(QMainWindow):
     def on_single_finished(self, success: bool, output_path: str):
         """Handle single image upscaling completion."""
         self.single_upscale_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+        if self.processor.is_cancelled():
+            return
 
         if success:
             self.output_viewer.load_image(output_path)
@@ -300,27 +313,33 @@ class MainWindow(QMainWindow):
     def on_batch_finished(self, success_count: int, total: int, failed_files: list):
         """Handle batch upscaling completion."""
         self.batch_upscale_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+        if self.processor.is_cancelled():
+            title, summary = "Batch Cancelled", "Batch processing cancelled!"
+        else:
+            title, summary = "Batch Complete", "Batch processing completed!"
 
         # Build message based on results
         if not failed_files:
             # All succeeded
             msg_box = self.create_themed_message_box(
                 QMessageBox.Icon.Information,
-                "Batch Complete",
-                f"Batch processing completed!\n\nSuccessfully upscaled: {success_count}/{total} images"
+                title,
+                f"{summary}\n\nSuccessfully upscaled: {success_count}/{total} images"
             )
         else:
             # Some failed
             failed_list = "\n".join([f"  • {name}" for name in failed_files])
             message = (
-                f"Batch processing completed!\n\n"
+                f"{summary}\n\n"
                 f"Successfully upscaled: {success_count}/{total} images\n"
                 f"Failed: {len(failed_files)} image(s)\n\n"
                 f"Failed files:\n{failed_list}"
             )
             msg_box = self.create_themed_message_box(
                 QMessageBox.Icon.Warning if success_count > 0 else QMessageBox.Icon.Critical,
-                "Batch Complete",
+                title,
                 message
             )
         msg_box.exec()
@@ -329,6 +348,7 @@ class MainWindow(QMainWindow):
         """Handle processing errors."""
         self.single_upscale_button.setEnabled(True)
         self.batch_upscale_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         msg_box = self.create_themed_message_box(
             QMessageBox.Icon.Critical, "Error", error_message
         )
@@ -354,7 +374,8 @@ class MainWindow(QMainWindow):
         """Open settings dialog."""
         from src.ui.dialogs.settings_dialog import SettingsDialog
 
-        dialog = SettingsDialog(self)
+        dialog = SettingsDialog(self, bf16_supported=self.processor.bf16_supported)
+        dialog.settings_saved.connect(self.processor.invalidate_settings)
         if dialog.exec():
             # Update model display when settings are saved
             self.update_model_display()
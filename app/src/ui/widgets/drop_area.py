@@ -2,11 +2,16 @@
 
 from pathlib import Path
 from PySide6.QtCore import Qt, Signal, QSize
-from PySide6.QtGui import QDragEnterEvent, QDropEvent, QPixmap
+from PySide6.QtGui import QDragEnterEvent, QDropEvent
 from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget, QFileDialog
 
+from src.ui.widgets.scaled_image import ScaledImageMixin
 
-class ImageDropArea(QWidget):
+# File extensions accepted by drag and drop, lowercase with the leading dot
+_VALID_IMAGE_SUFFIXES = frozenset((".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"))
+
+
+class ImageDropArea(ScaledImageMixin, QWidget):
     """Widget for drag-and-drop image upload."""
 
     image_dropped = Signal(str)
@@ -14,7 +19,7 @@ class ImageDropArea(QWidget):
     def __init__(self, placeholder_text: str = "Drop image here"):
         super().__init__()
         self.placeholder_text = placeholder_text
-        self.current_image_path = None
+        self.setup_scaling()
         self.setup_ui()
 
     def setup_ui(self):
@@ -66,33 +71,4 @@ class ImageDropArea(QWidget):
 
     def is_valid_image(self, file_path: str) -> bool:
         """Check if file is a valid image."""
-        valid_extensions = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"}
-        return Path(file_path).suffix.lower() in valid_extensions
-
-    def load_image(self, file_path: str):
-        """Load and display image."""
-        self.current_image_path = file_path
-        pixmap = QPixmap(file_path)
-
-        if not pixmap.isNull():
-            # Scale pixmap to fit the label while maintaining aspect ratio
-            scaled_pixmap = pixmap.scaled(
-                self.image_label.size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            self.image_label.setPixmap(scaled_pixmap)
-        else:
-            self.image_label.setText("Failed to load image")
-
-    def resizeEvent(self, event):
-        """Handle resize event to rescale image."""
-        super().resizeEvent(event)
-        if self.current_image_path:
-            self.load_image(self.current_image_path)
-
-    def clear(self):
-        """Clear the displayed image."""
-        self.current_image_path = None
-        self.image_label.clear()
-        self.image_label.setText(self.placeholder_text)
+        return Path(file_path).suffix.lower() in _VALID_IMAGE_SUFFIXES
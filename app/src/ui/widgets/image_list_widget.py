@@ -1,7 +1,9 @@
 """Widget for displaying list of selected images with paths."""
 
+import os
 from pathlib import Path
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QObject, QRunnable, QSize, QThreadPool, Signal
+from PySide6.QtGui import QIcon, QImage, QPixmap, QPixmapCache
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -12,6 +14,32 @@ from PySide6.QtWidgets import (
     QPushButton,
 )
 
+from src.ui.widgets.scaled_image import read_scaled_image
+
+# Edge length of the list thumbnails
+THUMBNAIL_SIZE = 64
+
+
+class _ThumbnailSignals(QObject):
+    """Signals emitted by _ThumbnailTask."""
+
+    decoded = Signal(str, QImage)  # cache key, thumbnail
+
+
+class _ThumbnailTask(QRunnable):
+    """Decode one list thumbnail on the thumbnail pool."""
+
+    def __init__(self, file_path: str, cache_key: str, signals: _ThumbnailSignals):
+        super().__init__()
+        self.file_path = file_path
+        self.cache_key = cache_key
+        self.signals = signals
+
+    def run(self):
+        """Decode the image at thumbnail size and hand it back to the GUI thread."""
+        thumbnail = read_scaled_image(self.file_path, QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        self.signals.decoded.emit(self.cache_key, thumbnail)
+
 
 class ImageListWidget(QWidget):
     """Widget for displaying selected image files with their paths."""
@@ -21,7 +49,17 @@ class ImageListWidget(QWidget):
 
     def __init__(self):
         super().__init__()
-        self.image_paths = []
+        # (full path, filename, parent directory), split once when added
+        self._entries: list[tuple[str, str, str]] = []
+
+        # Thumbnails decode in parallel and are cached by path and mtime
+        self._thumb_pool = QThreadPool(self)
+        self._thumb_pool.setMaxThreadCount(os.cpu_count() or 1)
+        self._thumb_signals = _ThumbnailSignals(self)
+        self._thumb_signals.decoded.connect(self._on_thumbnail_decoded)
+        self._thumb_in_flight: set[str] = set()
+        self._thumb_items: dict[str, list[QListWidgetItem]] = {}
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -55,54 +93,103 @@ class ImageListWidget(QWidget):
         self.list_widget.setObjectName("imageListWidget")
         self.list_widget.setMinimumHeight(150)
         self.list_widget.setMaximumHeight(250)
+        self.list_widget.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
 
         layout.addLayout(header_layout)
         layout.addWidget(self.list_widget)
 
     def add_images(self, file_paths: list[str]):
         """Add images to the list."""
-        self.image_paths.extend(file_paths)
-        self._update_list()
-        self.images_changed.emit(self.image_paths)
+        entries = self._make_entries(file_paths)
+        self._entries.extend(entries)
+        self._append_items(entries)
+        self._refresh_count()
+        self.images_changed.emit(self.get_images())
 
     def set_images(self, file_paths: list[str]):
         """Set images, replacing current list."""
-        self.image_paths = file_paths
+        self._entries = self._make_entries(file_paths)
         self._update_list()
-        self.images_changed.emit(self.image_paths)
+        self.images_changed.emit(self.get_images())
 
     def clear_all(self):
         """Clear all images from the list."""
-        self.image_paths.clear()
+        self._entries.clear()
         self._update_list()
-        self.images_changed.emit(self.image_paths)
+        self.images_changed.emit(self.get_images())
         self.cleared.emit()
 
-    def _update_list(self):
-        """Update the list widget display."""
-        self.list_widget.clear()
-
-        for file_path in self.image_paths:
+    @staticmethod
+    def _make_entries(file_paths: list[str]) -> list[tuple[str, str, str]]:
+        """Split paths into (full path, filename, parent directory) entries."""
+        entries = []
+        for file_path in file_paths:
             path = Path(file_path)
-            item = QListWidgetItem()
-
-            # Create display text with filename and path
-            filename = path.name
-            parent_dir = str(path.parent)
+            entries.append((file_path, path.name, str(path.parent)))
+        return entries
 
-            item_text = f"{filename}\n{parent_dir}"
-            item.setText(item_text)
-            item.setToolTip(file_path)
-
-            self.list_widget.addItem(item)
-
-        # Update count label
-        count = len(self.image_paths)
+    def _update_list(self):
+        """Rebuild the list widget display from scratch."""
+        self.list_widget.clear()
+        self._thumb_items.clear()
+        self._append_items(self._entries)
+        self._refresh_count()
+
+    def _append_items(self, entries: list[tuple[str, str, str]]):
+        """Add list items for entries after the existing ones."""
+        # One repaint for the whole batch instead of one per item
+        self.list_widget.setUpdatesEnabled(False)
+        try:
+            for file_path, filename, parent_dir in entries:
+                item = QListWidgetItem()
+
+                # Create display text with filename and path
+                item.setText(f"{filename}\n{parent_dir}")
+                item.setToolTip(file_path)
+
+                self.list_widget.addItem(item)
+                self._request_thumbnail(file_path, item)
+        finally:
+            self.list_widget.setUpdatesEnabled(True)
+
+    def _refresh_count(self):
+        """Update the count label and clear button for the current images."""
+        count = len(self._entries)
         self.count_label.setText(f"({count} image{'s' if count != 1 else ''})")
 
         # Show/hide clear button
         self.clear_button.setVisible(count > 0)
 
+    def _request_thumbnail(self, file_path: str, item: QListWidgetItem):
+        """Set the item's thumbnail from the cache, or decode it in the background."""
+        try:
+            cache_key = f"{file_path}:{os.stat(file_path).st_mtime_ns}"
+        except OSError:
+            return
+
+        pixmap = QPixmapCache.find(cache_key)
+        if pixmap is not None:
+            item.setIcon(QIcon(pixmap))
+            return
+
+        self._thumb_items.setdefault(cache_key, []).append(item)
+        if cache_key not in self._thumb_in_flight:
+            self._thumb_in_flight.add(cache_key)
+            self._thumb_pool.start(_ThumbnailTask(file_path, cache_key, self._thumb_signals))
+
+    def _on_thumbnail_decoded(self, cache_key: str, thumbnail: QImage):
+        """Cache a decoded thumbnail and show it on the items still waiting for it."""
+        self._thumb_in_flight.discard(cache_key)
+        if thumbnail.isNull():
+            self._thumb_items.pop(cache_key, None)
+            return
+
+        pixmap = QPixmap.fromImage(thumbnail)
+        QPixmapCache.insert(cache_key, pixmap)
+        icon = QIcon(pixmap)
+        for item in self._thumb_items.pop(cache_key, []):
+            item.setIcon(icon)
+
     def get_images(self) -> list[str]:
         """Get list of image paths."""
-        return self.image_paths.copy()
+        return [entry[0] for entry in self._entries]
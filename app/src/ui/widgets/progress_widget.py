@@ -9,6 +9,9 @@ class ProgressWidget(QWidget):
 
     def __init__(self):
         super().__init__()
+        # Last shown value and status, to skip updates that change nothing
+        self._last_value = 0
+        self._last_status = "Ready"
         self.setup_ui()
 
     def setup_ui(self):
@@ -36,11 +39,18 @@ class ProgressWidget(QWidget):
 
     def set_progress(self, value: int, status: str = ""):
         """Set progress value and optional status text."""
+        if value == self._last_value and (not status or status == self._last_status):
+            return
+
+        self._last_value = value
         self.progress_bar.setValue(value)
         if status:
+            self._last_status = status
             self.status_label.setText(status)
 
     def reset(self):
         """Reset progress to initial state."""
+        self._last_value = 0
+        self._last_status = "Ready"
         self.progress_bar.setValue(0)
         self.status_label.setText("Ready")
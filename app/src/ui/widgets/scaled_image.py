@@ -0,0 +1,206 @@
+"""Shared display logic for widgets that show an image scaled to fit a label."""
+
+import os
+from typing import Optional
+from PySide6.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+
+# Delay before a smooth rescale, so a burst of resize events rescales only once
+RESCALE_DELAY_MS = 150
+
+
+def read_scaled_image(file_path: str, target_size: QSize) -> QImage:
+    """Decode an image no larger than needed to fill target_size.
+
+    The reader downsamples while decoding (JPEG scales in the DCT), so a
+    huge upscaled image never has to exist at full resolution in memory.
+    """
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid() and (
+        source_size.width() > target_size.width() or source_size.height() > target_size.height()
+    ):
+        reader.setScaledSize(source_size.scaled(target_size, Qt.AspectRatioMode.KeepAspectRatio))
+    return reader.read()
+
+
+class _ImageSignals(QObject):
+    """Signals emitted by the decode and scale tasks."""
+
+    decoded = Signal(QImage, int)  # image, generation
+    scaled = Signal(QImage, int)  # image, generation
+
+
+class _DecodeTask(QRunnable):
+    """Decode an image file on the thread pool.
+
+    Decoding produces a QImage, which unlike QPixmap can be built off the GUI
+    thread; the widget converts it to a pixmap when the signal arrives.
+    """
+
+    def __init__(self, file_path: str, target_size: QSize, generation: int, signals: _ImageSignals):
+        super().__init__()
+        self.file_path = file_path
+        self.target_size = target_size
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        """Decode the image and hand it back to the GUI thread."""
+        self.signals.decoded.emit(read_scaled_image(self.file_path, self.target_size), self.generation)
+
+
+class _SmoothScaleTask(QRunnable):
+    """Smooth-scale an image on the thread pool.
+
+    QPixmap may only be used on the GUI thread, so the work is done on a
+    QImage and converted back to a pixmap once it reaches the widget.
+    """
+
+    def __init__(self, image: QImage, size: QSize, generation: int, signals: _ImageSignals):
+        super().__init__()
+        self.image = image
+        self.size = size
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        """Scale the image and hand it back to the GUI thread."""
+        scaled_image = self.image.scaled(
+            self.size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        self.signals.scaled.emit(scaled_image, self.generation)
+
+
+class ScaledImageMixin:
+    """Mixin for widgets that show an image in self.image_label, scaled to fit.
+
+    The file is decoded once on the thread pool, no larger than the screen,
+    and every rescale starts from that cached image. Resizes are debounced, so dragging the
+    window edge ends in one smooth scale instead of one per resize event.
+    Each rescale shows a fast scale right away and swaps in a smooth one
+    computed on the thread pool; a generation counter drops decodes and
+    smooth scales that finish after a newer image or size has been requested.
+    Smooth scales go into QPixmapCache, so returning to an earlier size
+    shows the smooth pixmap straight away.
+
+    Widgets set self.placeholder_text and self.image_label, and call
+    setup_scaling() before any image is loaded.
+    """
+
+    def setup_scaling(self):
+        """Initialize the cached source pixmap and the rescale timer."""
+        self.current_image_path = None
+        self._source_pixmap: Optional[QPixmap] = None
+        self._source_image: Optional[QImage] = None
+        # (path, mtime, decode size) of the cached source, to skip decoding it again
+        self._source_key: Optional[tuple] = None
+        # QPixmapCache key of the smooth scale being computed
+        self._scaled_cache_key: Optional[str] = None
+        self._generation = 0
+        self._image_signals = _ImageSignals(self)
+        self._image_signals.decoded.connect(self._on_decoded)
+        self._image_signals.scaled.connect(self._on_smooth_scaled)
+        self._rescale_timer = QTimer(self)
+        self._rescale_timer.setSingleShot(True)
+        self._rescale_timer.setInterval(RESCALE_DELAY_MS)
+        self._rescale_timer.timeout.connect(self._apply_scaled)
+
+    def load_image(self, file_path: str, target_size: Optional[QSize] = None):
+        """Load and display image.
+
+        Args:
+            file_path: Path to the image
+            target_size: Largest size to decode the image at (default: the screen size)
+        """
+        target_size = target_size or self.screen().size()
+        try:
+            source_key = (file_path, os.stat(file_path).st_mtime_ns, target_size.toTuple())
+        except OSError:
+            source_key = None
+
+        self.current_image_path = file_path
+        if source_key is not None and source_key == self._source_key and self._source_pixmap is not None:
+            # Same unchanged file, so only the scaling needs to be redone
+            self._apply_scaled()
+            return
+
+        self._rescale_timer.stop()
+        self._generation += 1
+        self._source_key = source_key
+        self._source_pixmap = None
+        self._source_image = None
+        self.image_label.setText("Loading image...")
+
+        QThreadPool.globalInstance().start(
+            _DecodeTask(file_path, target_size, self._generation, self._image_signals)
+        )
+
+    def _on_decoded(self, image: QImage, generation: int):
+        """Cache and show a decoded image unless a newer one has been requested."""
+        if generation != self._generation:
+            return
+
+        if not image.isNull():
+            self._source_image = image
+            self._source_pixmap = QPixmap.fromImage(image)
+            self._apply_scaled()
+        else:
+            self._source_key = None
+            self.image_label.setText("Failed to load image")
+
+    def _apply_scaled(self):
+        """Scale the cached image to fit the label while maintaining aspect ratio."""
+        if self._source_pixmap is None:
+            return
+
+        self._generation += 1
+        size = self.image_label.size()
+
+        self._scaled_cache_key = None
+        if self._source_key is not None:
+            path, mtime_ns, _ = self._source_key
+            self._scaled_cache_key = f"{path}:{mtime_ns}@{size.width()}x{size.height()}"
+            cached_pixmap = QPixmapCache.find(self._scaled_cache_key)
+            if cached_pixmap is not None:
+                self.image_label.setPixmap(cached_pixmap)
+                return
+
+        # Show a fast scale now, then replace it with the smooth one when ready
+        scaled_pixmap = self._source_pixmap.scaled(
+            size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.FastTransformation,
+        )
+        self.image_label.setPixmap(scaled_pixmap)
+        QThreadPool.globalInstance().start(
+            _SmoothScaleTask(self._source_image, size, self._generation, self._image_signals)
+        )
+
+    def _on_smooth_scaled(self, image: QImage, generation: int):
+        """Show a finished smooth scale unless a newer one has been requested."""
+        if generation == self._generation:
+            pixmap = QPixmap.fromImage(image)
+            if self._scaled_cache_key is not None:
+                QPixmapCache.insert(self._scaled_cache_key, pixmap)
+            self.image_label.setPixmap(pixmap)
+
+    def resizeEvent(self, event):
+        """Handle resize event to rescale image once resizing settles."""
+        super().resizeEvent(event)
+        if self._source_pixmap is not None:
+            self._rescale_timer.start()
+
+    def clear(self):
+        """Clear the displayed image."""
+        self._rescale_timer.stop()
+        self._generation += 1
+        self.current_image_path = None
+        self._source_key = None
+        self._source_pixmap = None
+        self._source_image = None
+        self.image_label.clear()
+        self.image_label.setText(self.placeholder_text)
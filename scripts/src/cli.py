@@ -14,9 +14,6 @@ if __name__ == "__main__" and __package__ is None:
     parent_dir = script_dir.parent.parent
     if str(parent_dir) not in sys.path:
         sys.path.insert(0, str(parent_dir))
-    from scripts.src.models.real_esrgan import RealESRGANUpscaler
-else:
-    from .models.real_esrgan import RealESRGANUpscaler
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -29,27 +26,96 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
+def parse_tile(value: str) -> int | str:
+    """Parse a --tile value: "auto" or a non-negative tile size."""
+    if value == "auto":
+        return value
+    try:
+        tile = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected 'auto' or a tile size, got '{value}'") from None
+    if tile < 0:
+        raise argparse.ArgumentTypeError("tile size must not be negative")
+    return tile
+
+
+def report_results(pairs: list[tuple[Path, Path]], results: list[bool], output_path: Path) -> int:
+    """Print the outcome of an upscale job and return the exit code."""
+    if len(pairs) == 1:
+        if results[0]:
+            print(f"✓ Successfully upscaled to: {output_path}")
+            return 0
+        print("✗ Upscaling failed", file=sys.stderr)
+        return 1
+
+    failed = [input_path.name for (input_path, _), success in zip(pairs, results, strict=True) if not success]
+    print(f"✓ Upscaled {len(pairs) - len(failed)}/{len(pairs)} images to: {output_path}")
+    if failed:
+        print(f"✗ Failed: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
 def upscale_command(args: argparse.Namespace) -> int:
     """Handle the upscale command."""
-    input_path = Path(args.input)
+    input_paths = [Path(path) for path in args.inputs]
     output_path = Path(args.output)
     
-    if not input_path.exists():
-        print(f"Error: Input file '{input_path}' not found", file=sys.stderr)
-        return 1
-    
-    if not input_path.is_file():
-        print(f"Error: '{input_path}' is not a file", file=sys.stderr)
-        return 1
+    for input_path in input_paths:
+        if not input_path.exists():
+            print(f"Error: Input file '{input_path}' not found", file=sys.stderr)
+            return 1
+        
+        if not input_path.is_file():
+            print(f"Error: '{input_path}' is not a file", file=sys.stderr)
+            return 1
     
-    print(f"Upscaling: {input_path} -> {output_path}")
+    if len(input_paths) == 1:
+        print(f"Upscaling: {input_paths[0]} -> {output_path}")
+    else:
+        if output_path.is_file():
+            print(f"Error: '{output_path}' must be a directory when upscaling several images", file=sys.stderr)
+            return 1
+        print(f"Upscaling {len(input_paths)} images -> {output_path}")
     print(f"Using model: {args.model}")
-    
-    upscaler = RealESRGANUpscaler(model_name=args.model)
+
+    if len(input_paths) == 1:
+        pairs = [(input_paths[0], output_path)]
+    else:
+        pairs = [
+            (input_path, output_path / f"{input_path.stem}_upscaled{input_path.suffix}")
+            for input_path in input_paths
+        ]
+
+    if __package__:
+        from . import daemon
+    else:
+        from scripts.src import daemon
+
+    # A running daemon already has the model loaded, so hand the job to it
+    try:
+        results = daemon.request_upscale(args.model, pairs, tile=args.tile)
+    except (OSError, RuntimeError) as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+    if results is not None:
+        print("Upscaled by the running daemon")
+        return report_results(pairs, results, output_path)
+
+    # Imported here so --help and argument errors don't pay for torch and friends
+    if __package__:
+        from .models.real_esrgan import RealESRGANUpscaler
+    else:
+        from scripts.src.models.real_esrgan import RealESRGANUpscaler
+
+    upscaler = RealESRGANUpscaler(model_name=args.model, tile=args.tile, compile_model=args.compile)
     
     try:
+        if len(input_paths) > 1:
+            return report_results(pairs, upscaler.upscale_batch(pairs), output_path)
+
         success = upscaler.upscale(
-            input_path=input_path,
+            input_path=input_paths[0],
             output_path=output_path,
             prompt=args.prompt,
             negative_prompt=args.negative_prompt,
@@ -57,13 +123,7 @@ def upscale_command(args: argparse.Namespace) -> int:
             guidance_scale=args.guidance,
             noise_level=args.noise_level,
         )
-        
-        if success:
-            print(f"✓ Successfully upscaled to: {output_path}")
-            return 0
-        else:
-            print("✗ Upscaling failed", file=sys.stderr)
-            return 1
+        return report_results(pairs, [success], output_path)
             
     except KeyboardInterrupt:
         print("\\n✗ Upscaling cancelled", file=sys.stderr)
@@ -75,6 +135,32 @@ def upscale_command(args: argparse.Namespace) -> int:
         upscaler.cleanup()
 
 
+def daemon_command(args: argparse.Namespace) -> int:
+    """Handle the daemon command."""
+    if __package__:
+        from . import daemon
+    else:
+        from scripts.src import daemon
+
+    if not daemon.is_supported():
+        print("Error: Daemon mode needs UNIX domain sockets, which this platform lacks", file=sys.stderr)
+        return 1
+
+    print(f"Loading model: {args.model}")
+    try:
+        daemon.serve(
+            args.model,
+            compile_model=args.compile,
+            on_ready=lambda socket_path: print(f"Listening on: {socket_path} (Ctrl+C to stop)", flush=True),
+        )
+    except KeyboardInterrupt:
+        print("\n✓ Daemon stopped")
+    except Exception as e:
+        print(f"✗ Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
 def main() -> int:
     """Main CLI entry point."""
     parser = argparse.ArgumentParser(
@@ -96,15 +182,17 @@ def main() -> int:
     )
     
     upscale_parser.add_argument(
-        "input",
+        "inputs",
         type=str,
-        help="Input image path",
+        nargs="+",
+        metavar="input",
+        help="Input image path (several paths upscale them as a batch)",
     )
     
     upscale_parser.add_argument(
         "output",
         type=str,
-        help="Output image path",
+        help="Output image path, or output directory when several inputs are given",
     )
     
     upscale_parser.add_argument(
@@ -150,12 +238,48 @@ def main() -> int:
         help="Model to use: RealESRGAN_x4plus (general) or RealESRGAN_x4plus_anime_6B (anime) (default: %(default)s)",
     )
     
+    upscale_parser.add_argument(
+        "--tile",
+        type=parse_tile,
+        default="auto",
+        help="Tile size in pixels, 0 for the whole image, or 'auto' for the largest tile "
+        "that fits in free VRAM (default: %(default)s)",
+    )
+    
+    upscale_parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile the model with torch.compile for faster GPU inference on large batches "
+        "(the first image is slower while it compiles)",
+    )
+    
+    daemon_parser = subparsers.add_parser(
+        "daemon",
+        help="Keep a model loaded and serve upscale commands over a UNIX socket",
+    )
+    
+    daemon_parser.add_argument(
+        "--model",
+        type=str,
+        default="RealESRGAN_x4plus",
+        choices=["RealESRGAN_x4plus", "RealESRGAN_x4plus_anime_6B"],
+        help="Model to load at startup; other models load on first use (default: %(default)s)",
+    )
+    
+    daemon_parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile models with torch.compile for faster GPU inference",
+    )
+    
     args = parser.parse_args()
     
     setup_logging(args.verbose)
     
     if args.command == "upscale":
         return upscale_command(args)
+    elif args.command == "daemon":
+        return daemon_command(args)
     else:
         parser.print_help()
         return 1
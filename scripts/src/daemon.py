@@ -0,0 +1,189 @@
+"""Daemon mode that keeps upscalers loaded between CLI invocations."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# File name of the daemon's socket inside the runtime directory
+SOCKET_NAME = "superimage.sock"
+
+# Seconds to wait for a daemon to accept a connection before upscaling in-process
+CONNECT_TIMEOUT = 5
+
+# Seconds per image to wait for the daemon's response, so a hung daemon can't block forever
+RESPONSE_TIMEOUT_PER_IMAGE = 600
+
+# Seconds the daemon waits on a connected client's request, so a stuck client can't block it
+CLIENT_TIMEOUT = 30
+
+
+def get_socket_path() -> Path:
+    """Get the daemon socket path, in $XDG_RUNTIME_DIR when it is set.
+
+    The temp directory fallback is shared by all users, so the file name
+    includes the user ID there.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_NAME
+    return Path(tempfile.gettempdir()) / f"superimage-{os.getuid()}.sock"
+
+
+def is_supported() -> bool:
+    """Check if this platform has UNIX domain sockets."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def _is_listening(socket_path: Path) -> bool:
+    """Check if a daemon is accepting connections on socket_path."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        probe.settimeout(CONNECT_TIMEOUT)
+        try:
+            probe.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return False
+    return True
+
+
+def request_upscale(
+    model_name: str,
+    pairs: list[tuple[Path, Path]],
+    outscale: float = 4.0,
+    tile: int | str = "auto",
+) -> Optional[list[bool]]:
+    """Ask a running daemon to upscale images.
+
+    Args:
+        model_name: Model to upscale with
+        pairs: (input path, output path) for each image
+        outscale: Output scale factor (default: 4.0)
+        tile: Tile size, or "auto" to size tiles from free VRAM (default: "auto")
+
+    Returns:
+        Per-image success flags, or None if no daemon of this user is running
+    """
+    if not is_supported():
+        return None
+
+    socket_path = get_socket_path()
+    try:
+        owner = socket_path.stat().st_uid
+    except FileNotFoundError:
+        return None
+    if owner != os.getuid():
+        # Never send paths to, or trust results from, another user's socket
+        logger.warning(f"Ignoring daemon socket {socket_path} owned by another user")
+        return None
+
+    request = {
+        "model": model_name,
+        "pairs": [[str(input_path.resolve()), str(output_path.resolve())] for input_path, output_path in pairs],
+        "outscale": outscale,
+        "tile": tile,
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(CONNECT_TIMEOUT)
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError, PermissionError, TimeoutError):
+            return None
+
+        client.settimeout(RESPONSE_TIMEOUT_PER_IMAGE * max(len(pairs), 1))
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps(request).encode() + b"\n")
+            stream.flush()
+            response = json.loads(stream.readline() or b"{}")
+
+    if "results" not in response:
+        raise RuntimeError(f"Daemon error: {response.get('error', 'no response')}")
+    return response["results"]
+
+
+def serve(
+    model_name: str,
+    compile_model: bool = False,
+    on_ready: Optional[Callable[[Path], None]] = None,
+) -> None:
+    """Load model_name and serve upscale requests until interrupted.
+
+    Requests and responses are single JSON lines. Other models and tile
+    sizes are loaded on their first request and kept loaded too.
+
+    Args:
+        model_name: Model to load up front
+        compile_model: Compile the models with torch.compile (default: False)
+        on_ready: Called with the socket path once the daemon is accepting connections
+
+    Raises:
+        RuntimeError: If another daemon is already listening on the socket
+    """
+    from .models.real_esrgan import AUTO_TILE, RealESRGANUpscaler
+
+    socket_path = get_socket_path()
+    if _is_listening(socket_path):
+        raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+    upscalers = {(model_name, AUTO_TILE): RealESRGANUpscaler(model_name=model_name, compile_model=compile_model)}
+    upscalers[model_name, AUTO_TILE].warmup()
+
+    socket_path.unlink(missing_ok=True)  # Left behind by a daemon that was killed
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        # Create the socket owner-only, so it is never connectable by other users
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        logger.info(f"Daemon listening on {socket_path}")
+        if on_ready is not None:
+            on_ready(socket_path)
+
+        try:
+            while True:
+                connection, _ = server.accept()
+                connection.settimeout(CLIENT_TIMEOUT)
+                with connection, connection.makefile("rwb") as stream:
+                    try:
+                        line = stream.readline()
+                    except TimeoutError:
+                        logger.warning("Client sent no request in time, closing the connection")
+                        continue
+                    if not line:
+                        continue  # Another daemon checking if this one is running
+
+                    try:
+                        request = json.loads(line)
+                        key = request["model"], request.get("tile", AUTO_TILE)
+                        if key not in upscalers:
+                            upscalers[key] = RealESRGANUpscaler(
+                                model_name=key[0], tile=key[1], compile_model=compile_model
+                            )
+                        results = upscalers[key].upscale_batch(
+                            [(Path(input_path), Path(output_path)) for input_path, output_path in request["pairs"]],
+                            outscale=request.get("outscale", 4.0),
+                        )
+                        response = {"results": results}
+                    except Exception as e:
+                        logger.error(f"Request failed: {e}", exc_info=True)
+                        response = {"error": str(e)}
+
+                    try:
+                        stream.write(json.dumps(response).encode() + b"\n")
+                        stream.flush()
+                    except OSError:
+                        logger.warning("Client disconnected before the response was sent")
+        finally:
+            socket_path.unlink(missing_ok=True)
+            for upscaler in upscalers.values():
+                upscaler.cleanup()
@@ -3,22 +3,33 @@
 from __future__ import annotations
 
 import gc
+import hashlib
+import importlib.util
 import logging
+import math
+import os
 import sys
 import types
+import urllib.error
+import urllib.request
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cache
 from pathlib import Path
 from typing import Optional
 
 import cv2
 import numpy as np
 import torch
+import torch.nn.functional as F
+from PIL import Image
+from torch import nn
 
 # Fix for torchvision compatibility with newer versions
 # torchvision.transforms.functional_tensor was deprecated and removed
-# Create a compatibility shim for basicsr
-try:
-    from torchvision.transforms import functional_tensor
-except ImportError:
+# Create a compatibility shim for basicsr, only when the module is really gone
+if importlib.util.find_spec("torchvision.transforms.functional_tensor") is None:
     from torchvision.transforms.functional import rgb_to_grayscale
     functional_tensor = types.ModuleType("torchvision.transforms.functional_tensor")
     functional_tensor.rgb_to_grayscale = rgb_to_grayscale
@@ -27,24 +38,271 @@ except ImportError:
 from basicsr.archs.rrdbnet_arch import RRDBNet
 from realesrgan import RealESRGANer
 
+# Optional libjpeg-turbo bindings for faster JPEG decoding
+try:
+    from turbojpeg import TJPF_BGR, TJPF_GRAY, TJSAMP_GRAY, TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
 logger = logging.getLogger(__name__)
 
+# Make sure OpenCV's SIMD code paths and all cores are used for the final
+# resize to outscale and for color conversions; some builds ship with either off
+cv2.setUseOptimized(True)
+cv2.setNumThreads(os.cpu_count() or -1)  # -1 restores OpenCV's default
+logger.debug(f"OpenCV {cv2.__version__}: Intel IPP {'enabled' if cv2.ipp.useIPP() else 'not available'}")
+
 
 # Model configurations mapping
+# "sha256" is checked against the downloaded weights before they are used
 MODEL_CONFIGS = {
     "RealESRGAN_x4plus": {
         "url": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.1.0/RealESRGAN_x4plus.pth",
+        "sha256": "4fa0d38905f75ac06eb49a7951b426670021be3018265fd191d2125df9d682f1",
         "scale": 4,
         "num_block": 23,
     },
     "RealESRGAN_x4plus_anime_6B": {
         "url": "https://github.com/xinntao/Real-ESRGAN/releases/download/v0.2.2.4/RealESRGAN_x4plus_anime_6B.pth",
+        "sha256": "f872d837d3c90ed2e05227bed711af5671a6fd1c9f7d7e91c911a61f155e99da",
         "scale": 4,
         "num_block": 6,
     },
 }
 
 
+# Bytes read per chunk when downloading model weights
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Seconds to wait on a stalled model download connection
+DOWNLOAD_TIMEOUT = 30
+
+# Default tile size, also used by automatic sizing when not running on CUDA
+DEFAULT_TILE = 400
+
+# Tile setting that sizes tiles from free VRAM for every image
+AUTO_TILE = "auto"
+
+# Feature channels of the RRDBNet body, used to estimate activation memory
+NUM_FEAT = 64
+
+# Headroom for conv workspaces and intermediate copies when sizing tiles and batches
+VRAM_SAFETY = 4
+
+# Upper bound on images per batched forward pass, to bound host memory
+MAX_BATCH_SIZE = 16
+
+# Images decoded ahead of the one being upscaled in upscale_batch
+PREFETCH_DEPTH = 2
+
+# PIL save options matching cv2.imwrite's defaults, by output suffix (JPEG otherwise)
+PIL_SAVE_OPTIONS = {
+    ".png": {"compress_level": 1},
+    ".webp": {"lossless": True},
+}
+
+# Smallest tile the automatic sizing and OOM fallback will go down to
+MIN_TILE = 64
+
+# Images upscaled between flushes of the CUDA cache and the garbage collector
+MEMORY_FLUSH_INTERVAL = 32
+
+
+# Inference precisions offered in the settings, by name
+PRECISION_DTYPES = {
+    "FP32": torch.float32,
+    "FP16": torch.float16,
+    "BF16": torch.bfloat16,
+}
+
+
+def bf16_supported() -> bool:
+    """Check if the current GPU can run bfloat16 inference natively."""
+    return torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+
+
+@cache
+def _get_turbojpeg() -> Optional[TurboJPEG]:
+    """Create the libjpeg-turbo decoder once, or return None if it is unavailable."""
+    if TurboJPEG is None:
+        return None
+    try:
+        return TurboJPEG()
+    except (OSError, RuntimeError) as e:
+        # PyTurboJPEG is installed but the libturbojpeg library was not found
+        logger.debug(f"libjpeg-turbo unavailable, decoding JPEGs with OpenCV: {e}")
+        return None
+
+
+def get_available_devices() -> list[str]:
+    """List the devices an upscaler can run on, one entry per CUDA GPU."""
+    if torch.cuda.is_available():
+        return [f"cuda:{index}" for index in range(torch.cuda.device_count())]
+    return ["cpu"]
+
+
+class UpscaleCancelled(Exception):
+    """Raised between tile batches when the caller's is_cancelled check returns True."""
+
+
+class _ModelAdapter(nn.Module):
+    """Run a model in another dtype or memory layout than callers pass in.
+
+    RealESRGANer only knows about float16 (its half flag), so bfloat16 is
+    handled here: inputs are cast to the model dtype and outputs cast back
+    to float32. With channels_last, weights and inputs are kept NHWC, which
+    lets cuDNN pick its tensor-core friendly kernels.
+    """
+
+    def __init__(self, model: nn.Module, dtype: Optional[torch.dtype] = None, channels_last: bool = False):
+        super().__init__()
+        if dtype is not None:
+            model = model.to(dtype)
+        if channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        self.model = model
+        self.dtype = dtype
+        self.channels_last = channels_last
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        if self.dtype is not None:
+            x = x.to(self.dtype)
+        if self.channels_last:
+            x = x.contiguous(memory_format=torch.channels_last)
+        output = self.model(x)
+        return output.float() if self.dtype is not None else output
+
+
+class _TiledRealESRGANer(RealESRGANer):
+    """RealESRGANer whose tile loop batches tiles and lets inference errors propagate.
+
+    The upstream tile_process runs one tile per forward pass and prints and
+    swallows RuntimeError for each tile, which turns an out-of-memory tile
+    into a crash or a stale tile in the output instead of an error the
+    caller can recover from. Here tiles with the same padded shape are
+    stacked into batches of up to tile_batch_size, so small tiles don't
+    leave the GPU idle between kernel launches, and tiles are merged into
+    a pooled output buffer that is reused across images. If is_cancelled
+    is set, it is checked after every batch so a large image can be
+    abandoned partway through.
+    """
+
+    tile_batch_size = 1
+    is_cancelled: Optional[Callable[[], bool]] = None
+    _output_pool: Optional[torch.Tensor] = None
+
+    def pre_process(self, img):
+        """Move the image to the device and pad it, uploading through pinned memory on CUDA.
+
+        Copies from pageable memory are staged through a driver buffer, while
+        a pinned (page-locked) source is copied by DMA at full bus speed.
+        PyTorch caches pinned blocks, so steady-state batches reuse them.
+        """
+        if self.device.type != "cuda":
+            super().pre_process(img)
+            return
+
+        img = torch.from_numpy(img).pin_memory().to(self.device, non_blocking=True)
+        self.img = img.permute(2, 0, 1).unsqueeze(0)
+        if self.half:
+            self.img = self.img.half()
+
+        # Same padding as upstream: pre_pad, then mod pad for divisible borders
+        if self.pre_pad != 0:
+            self.img = F.pad(self.img, (0, self.pre_pad, 0, self.pre_pad), "reflect")
+        if self.scale == 2:
+            self.mod_scale = 2
+        elif self.scale == 1:
+            self.mod_scale = 4
+        if self.mod_scale is not None:
+            _, _, height, width = self.img.shape
+            self.mod_pad_h = (self.mod_scale - height % self.mod_scale) % self.mod_scale
+            self.mod_pad_w = (self.mod_scale - width % self.mod_scale) % self.mod_scale
+            self.img = F.pad(self.img, (0, self.mod_pad_w, 0, self.mod_pad_h), "reflect")
+
+    def tile_process(self):
+        """Run the model on batches of tiles and merge the tiles into the output."""
+        batch, channel, height, width = self.img.shape
+        self.output = self._pooled_output((batch, channel, height * self.scale, width * self.scale))
+
+        tiles_x = math.ceil(width / self.tile_size)
+        tiles_y = math.ceil(height / self.tile_size)
+
+        # (input area, output area, output area inside the tile) by padded tile shape
+        tiles_by_shape: dict[tuple[int, int], list[tuple[tuple[slice, slice], ...]]] = {}
+        for y in range(tiles_y):
+            for x in range(tiles_x):
+                # Input tile area on the whole image, with and without padding
+                input_start_x = x * self.tile_size
+                input_end_x = min(input_start_x + self.tile_size, width)
+                input_start_y = y * self.tile_size
+                input_end_y = min(input_start_y + self.tile_size, height)
+
+                input_start_x_pad = max(input_start_x - self.tile_pad, 0)
+                input_end_x_pad = min(input_end_x + self.tile_pad, width)
+                input_start_y_pad = max(input_start_y - self.tile_pad, 0)
+                input_end_y_pad = min(input_end_y + self.tile_pad, height)
+
+                # Output tile area on the whole image, and the same area inside the padded tile
+                output_start_x_tile = (input_start_x - input_start_x_pad) * self.scale
+                output_end_x_tile = output_start_x_tile + (input_end_x - input_start_x) * self.scale
+                output_start_y_tile = (input_start_y - input_start_y_pad) * self.scale
+                output_end_y_tile = output_start_y_tile + (input_end_y - input_start_y) * self.scale
+
+                shape = (input_end_y_pad - input_start_y_pad, input_end_x_pad - input_start_x_pad)
+                tiles_by_shape.setdefault(shape, []).append((
+                    (slice(input_start_y_pad, input_end_y_pad), slice(input_start_x_pad, input_end_x_pad)),
+                    (
+                        slice(input_start_y * self.scale, input_end_y * self.scale),
+                        slice(input_start_x * self.scale, input_end_x * self.scale),
+                    ),
+                    (slice(output_start_y_tile, output_end_y_tile), slice(output_start_x_tile, output_end_x_tile)),
+                ))
+
+        tiles_done = 0
+        for tiles in tiles_by_shape.values():
+            for start in range(0, len(tiles), self.tile_batch_size):
+                chunk = tiles[start:start + self.tile_batch_size]
+                input_tiles = torch.cat([self.img[:, :, rows, cols] for (rows, cols), _, _ in chunk])
+                output_tiles = self.model(input_tiles)
+                del input_tiles
+
+                for index, (_, (rows, cols), (tile_rows, tile_cols)) in enumerate(chunk):
+                    self.output[:, :, rows, cols] = output_tiles[index * batch:(index + 1) * batch, :, tile_rows, tile_cols]
+                del output_tiles
+
+                tiles_done += len(chunk)
+                logger.debug(f"Tile {tiles_done}/{tiles_x * tiles_y}")
+                if self.is_cancelled is not None and self.is_cancelled():
+                    raise UpscaleCancelled(f"Cancelled after {tiles_done}/{tiles_x * tiles_y} tiles")
+
+    def _pooled_output(self, shape: tuple[int, ...]) -> torch.Tensor:
+        """Get an uninitialized output tensor backed by the pooled buffer.
+
+        The tiles cover the whole output, so it needs no zeroing, and enhance
+        copies the result to the host before the buffer is used again. The
+        pool only grows, freeing the old buffer first to keep the peak low,
+        until release(keep_pool=False) drops it at the end of a job.
+        """
+        size = math.prod(shape)
+        pool = self._output_pool
+        if pool is None or pool.numel() < size or pool.dtype != self.img.dtype or pool.device != self.img.device:
+            self._output_pool = None
+            self._output_pool = pool = self.img.new_empty(size)
+        return pool[:size].view(shape)
+
+    def release(self, keep_pool: bool = True) -> None:
+        """Drop the last image's input and output tensors, and the pooled buffer unless keep_pool.
+
+        RealESRGANer keeps img and output as attributes, which would otherwise
+        hold the last image's tensors until the next image replaces them.
+        """
+        self.img = None
+        self.output = None
+        if not keep_pool:
+            self._output_pool = None
+
+
 class RealESRGANUpscaler:
     """Simple and efficient image super-resolution using Real-ESRGAN."""
     
@@ -53,19 +311,23 @@ class RealESRGANUpscaler:
         model_name: str = "RealESRGAN_x4plus",
         device: Optional[str] = None,
         torch_dtype: torch.dtype = torch.float16,
-        tile: int = 400,
+        tile: int | str = AUTO_TILE,
         tile_pad: int = 10,
         pre_pad: int = 0,
+        compile_model: bool = False,
     ):
         """Initialize the upscaler.
         
         Args:
             model_name: Model name (RealESRGAN_x4plus or RealESRGAN_x4plus_anime_6B)
-            device: Target device ('cuda', 'cpu', or None for auto)
-            torch_dtype: Tensor dtype for memory efficiency
-            tile: Tile size for processing images (default: 400, prevents VRAM overflow)
+            device: Target device ('cuda', 'cuda:N', 'cpu', or None for auto)
+            torch_dtype: Inference dtype (float32, float16, or bfloat16 on supported GPUs)
+            tile: Tile size for processing images (0 = whole image), or "auto" to
+                size tiles from free VRAM for each image (default: "auto")
             tile_pad: Padding for tiles to reduce seams (default: 10)
             pre_pad: Pre-padding size (default: 0)
+            compile_model: Compile the model with torch.compile; the first image
+                of each new tile shape is slow while it compiles (default: False)
         """
         if model_name not in MODEL_CONFIGS:
             raise ValueError(
@@ -80,7 +342,12 @@ class RealESRGANUpscaler:
         self.tile = tile
         self.tile_pad = tile_pad
         self.pre_pad = pre_pad
-        self.upsampler: Optional[RealESRGANer] = None
+        self.compile_model = compile_model
+        self.upsampler: Optional[_TiledRealESRGANer] = None
+        # Checked between tile batches; raises UpscaleCancelled once it returns True
+        self.is_cancelled: Optional[Callable[[], bool]] = None
+        self._warmed_up = False
+        self._images_processed = 0
         
         # Setup model cache directory in project folder
         project_root = Path(__file__).parent.parent.parent.parent
@@ -95,11 +362,10 @@ class RealESRGANUpscaler:
         
         if not model_path.exists():
             logger.info(f"Downloading model: {self.model_name}")
-            import urllib.request
             
             url = self.model_config["url"]
             try:
-                urllib.request.urlretrieve(url, model_path)
+                self._download(url, model_path)
                 logger.info(f"Model downloaded to: {model_path}")
             except Exception as e:
                 raise RuntimeError(
@@ -107,6 +373,62 @@ class RealESRGANUpscaler:
                 ) from e
         
         return model_path
+
+    def _download(self, url: str, model_path: Path) -> None:
+        """Stream weights into a .part file and move it into place when complete.
+
+        An interrupted download leaves the .part file behind, and the next
+        call resumes it with an HTTP Range request instead of starting over.
+        """
+        part_path = model_path.with_suffix(".pth.part")
+        downloaded = part_path.stat().st_size if part_path.exists() else 0
+
+        request = urllib.request.Request(url)
+        if downloaded:
+            request.add_header("Range", f"bytes={downloaded}-")
+            logger.info(f"Resuming download at {downloaded / 2**20:.1f} MB")
+
+        try:
+            response = urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or not downloaded:
+                raise
+            with e:
+                content_range = e.headers.get("Content-Range", "")
+            # 416 with "bytes */N": complete if the .part file holds exactly N bytes
+            total = content_range.rpartition("/")[2]
+            if not total.isdigit() or int(total) != downloaded:
+                logger.warning("Partial download does not match the remote file, restarting")
+                part_path.unlink()
+                return self._download(url, model_path)
+            response = None
+
+        if response is not None:
+            with response, open(part_path, "ab" if downloaded else "wb") as f:
+                if downloaded and response.status != 206:
+                    # The server ignored the range, so start from scratch
+                    f.truncate(0)
+                    downloaded = 0
+
+                total = downloaded + response.length if response.length is not None else None
+                next_report = 0.1
+                while chunk := response.read(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    downloaded += len(chunk)
+                    if total and downloaded / total >= next_report:
+                        logger.info(
+                            f"Downloaded {downloaded / 2**20:.1f}/{total / 2**20:.1f} MB "
+                            f"({downloaded / total:.0%})"
+                        )
+                        next_report = math.floor(downloaded / total * 10) / 10 + 0.1
+
+        with open(part_path, "rb") as f:
+            sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+        if sha256 != self.model_config["sha256"]:
+            part_path.unlink()
+            raise RuntimeError(f"Checksum mismatch for {model_path.name}: got {sha256}")
+
+        os.replace(part_path, model_path)
     
     def _load_upsampler(self) -> None:
         """Load the Real-ESRGAN upsampler lazily."""
@@ -124,7 +446,7 @@ class RealESRGANUpscaler:
             model = RRDBNet(
                 num_in_ch=3,
                 num_out_ch=3,
-                num_feat=64,
+                num_feat=NUM_FEAT,
                 num_block=num_block,
                 num_grow_ch=32,
                 scale=scale,
@@ -132,28 +454,149 @@ class RealESRGANUpscaler:
             
             # Determine GPU ID
             gpu_id = None
-            if self.device == "cuda":
-                gpu_id = 0 if torch.cuda.is_available() else None
+            if self.device.startswith("cuda") and torch.cuda.is_available():
+                gpu_id = torch.device(self.device).index or 0
             
             # Initialize upsampler
-            self.upsampler = RealESRGANer(
+            self.upsampler = _TiledRealESRGANer(
                 scale=scale,
                 model_path=str(model_path),
                 model=model,
-                tile=self.tile,
+                tile=0 if self.tile == AUTO_TILE else self.tile,
                 tile_pad=self.tile_pad,
                 pre_pad=self.pre_pad,
                 half=self.torch_dtype == torch.float16,
                 gpu_id=gpu_id,
             )
+            channels_last = self.device.startswith("cuda")
+            if self.torch_dtype == torch.bfloat16 or channels_last:
+                self.upsampler.model = _ModelAdapter(
+                    self.upsampler.model,
+                    dtype=torch.bfloat16 if self.torch_dtype == torch.bfloat16 else None,
+                    channels_last=channels_last,
+                )
+            if self.compile_model:
+                self.upsampler.model = torch.compile(self.upsampler.model, mode="reduce-overhead")
             
             logger.info("Real-ESRGAN model loaded successfully")
-            if self.tile > 0:
+            if self.tile == AUTO_TILE:
+                logger.info(f"Automatic tile sizing enabled: tile_pad={self.tile_pad}")
+            elif self.tile > 0:
                 logger.info(f"Tiled processing enabled: tile_size={self.tile}, tile_pad={self.tile_pad}")
             
         except Exception as e:
             raise RuntimeError(f"Failed to load Real-ESRGAN model: {e}") from e
     
+    def warmup(self) -> None:
+        """Load the model and run one dummy tile to pay CUDA setup costs up front.
+
+        The first forward pass creates the CUDA context and cuDNN handles and,
+        with a fixed tile size, lets cuDNN pick the fastest kernels for that
+        tile shape. Only the first call does any work.
+        """
+        if self._warmed_up:
+            return
+
+        self._load_upsampler()
+        if self.device.startswith("cuda"):
+            # TF32 matmuls on Ampere and newer
+            torch.set_float32_matmul_precision("high")
+            self._set_cudnn_benchmark()
+            size = self.tile + 2 * self.tile_pad if torch.backends.cudnn.benchmark else MIN_TILE
+
+            dtype = torch.float16 if self.upsampler.half else torch.float32
+            dummy = torch.zeros(1, 3, size, size, dtype=dtype, device=self.upsampler.device)
+            with torch.inference_mode():
+                self.upsampler.model(dummy)
+            del dummy
+            logger.info(f"Warmed up model with a {size}x{size} tile")
+
+        self._warmed_up = True
+
+    def _set_cudnn_benchmark(self) -> None:
+        """Turn cuDNN autotuning on for fixed tiles and off otherwise.
+
+        The flag is process-wide, so it is set for every image in case
+        another upscaler with a different tile setting ran last. Without a
+        fixed tile the shapes vary per image, so autotuning would search
+        again every time.
+        """
+        if self.device.startswith("cuda"):
+            torch.backends.cudnn.benchmark = self.tile != AUTO_TILE and self.tile > 0
+
+    def _pixel_budget(self) -> int:
+        """Estimate how many input pixels one forward pass can hold in free VRAM.
+
+        Memory PyTorch has reserved but isn't using counts as free too: the
+        caching allocator hands it out again, but the driver reports it as used.
+        """
+        device = torch.device(self.device)
+        free_bytes, _ = torch.cuda.mem_get_info(device)
+        free_bytes += torch.cuda.memory_reserved(device) - torch.cuda.memory_allocated(device)
+        element_size = self.torch_dtype.itemsize
+        scale = self.model_config["scale"]
+        return int(free_bytes / (NUM_FEAT * element_size * scale * scale * VRAM_SAFETY))
+
+    def _auto_tile_size(self, height: int, width: int) -> int:
+        """Pick the largest power-of-two tile that fits in free VRAM (0 = whole image)."""
+        if not self.device.startswith("cuda"):
+            return DEFAULT_TILE
+
+        side = math.isqrt(self._pixel_budget())
+        tile = 1 << (side.bit_length() - 1) if side > 0 else 0
+        if tile >= max(height, width):
+            return 0
+        return max(tile, MIN_TILE)
+
+    def _tile_batch_size(self) -> int:
+        """Get how many padded tiles fit in one forward pass."""
+        tile_size = self.upsampler.tile_size
+        if not self.device.startswith("cuda") or tile_size == 0:
+            return 1
+
+        side = tile_size + 2 * self.tile_pad
+        return max(1, min(MAX_BATCH_SIZE, self._pixel_budget() // (side * side)))
+
+    def max_batch_size(self, height: int, width: int) -> int:
+        """Get how many images of this size fit in one untiled forward pass."""
+        if not self.device.startswith("cuda"):
+            return 1
+        if self.tile != AUTO_TILE and 0 < self.tile < max(height, width):
+            return 1
+
+        pixels = (height + self.pre_pad) * (width + self.pre_pad)
+        return max(1, min(MAX_BATCH_SIZE, self._pixel_budget() // pixels))
+
+    def _enhance(self, img: np.ndarray, outscale: float) -> np.ndarray:
+        """Run the upsampler, halving the tile batch, then the tile size, and retrying on CUDA OOM."""
+        while True:
+            try:
+                output, _ = self.upsampler.enhance(img, outscale=outscale)
+                return output
+            except torch.cuda.OutOfMemoryError:
+                tile_batch_size = self.upsampler.tile_batch_size
+                tile_size = self.upsampler.tile_size
+                if tile_batch_size > 1:
+                    tile_batch_size //= 2
+                else:
+                    if tile_size == 0:
+                        tile_size = 1 << (max(img.shape[:2]) - 1).bit_length()
+                    tile_size //= 2
+                    if tile_size < MIN_TILE:
+                        raise
+
+            # Free the failed attempt only now: inside the except its traceback
+            # still referenced the tensors, so empty_cache could not release them
+            self.upsampler.release(keep_pool=False)
+            torch.cuda.empty_cache()
+
+            if tile_batch_size != self.upsampler.tile_batch_size:
+                logger.warning(f"Out of VRAM, retrying with {tile_batch_size} tiles per batch")
+            else:
+                logger.warning(f"Out of VRAM, retrying with tile size {tile_size}")
+            self.upsampler.tile_batch_size = tile_batch_size
+            self.upsampler.tile_size = tile_size
+
     def upscale(
         self,
         input_path: str | Path,
@@ -188,69 +631,387 @@ class RealESRGANUpscaler:
             return False
         
         try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            self._load_upsampler()
+            img = self.read_image(input_path)
+        except Exception as e:
+            logger.error(f"Failed to read image {input_path}: {e}")
+            return False
+
+        if img is None:
+            logger.error(f"Failed to load image: {input_path}")
+            return False
+
+        if self._make_output_dirs([output_path]):
+            return False
+
+        return self.upscale_image(img, output_path, outscale=outscale)
+
+    def upscale_image(self, img: np.ndarray, output_path: str | Path, outscale: float = 4.0) -> bool:
+        """Upscale an already decoded image and save it into an existing directory.
+
+        Args:
+            img: Image array as returned by read_image
+            output_path: Path to save upscaled image
+            outscale: Output scale factor (default: 4.0)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            output = self._upscale_array(img, outscale)
+            success = self._save_output(Path(output_path), output)
 
-            # Load image (using np.fromfile to handle non-ASCII paths)
-            img_buffer = np.fromfile(str(input_path), dtype=np.uint8)
-            img = cv2.imdecode(img_buffer, cv2.IMREAD_UNCHANGED)
-            del img_buffer  # Free memory immediately after decode
-            
-            if img is None:
-                logger.error(f"Failed to load image: {input_path}")
-                return False
-            
-            original_shape = img.shape[:2]
-            logger.info(f"Original input image size: {original_shape[1]}x{original_shape[0]}")
-            logger.info(f"Starting upscaling with scale: {outscale}x")
-            
-            # Upscale
-            output, _ = self.upsampler.enhance(img, outscale=outscale)
-            
-            # Clear GPU cache after processing to prevent VRAM accumulation
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            
-            # CRITICAL FIX: Clear RealESRGANer internal tensors to prevent RAM leak
-            # The upsampler stores img/output as instance variables which accumulate
-            # in batch processing. Must explicitly delete them after each image.
-            if self.upsampler is not None:
-                if hasattr(self.upsampler, 'img'):
-                    del self.upsampler.img
-                if hasattr(self.upsampler, 'output'):
-                    del self.upsampler.output
-            
-            # Save result (using imencode to handle non-ASCII paths)
-            is_success, buffer = cv2.imencode(output_path.suffix, output)
-            if is_success:
-                buffer.tofile(str(output_path))
-            else:
-                logger.error(f"Failed to encode output image: {output_path}")
-                del img, output  # Clean up even on failure
-                gc.collect()
-                return False
-            
-            output_shape = output.shape[:2]
-            logger.info(f"✓ Upscaled image saved: {output_path}")
-            logger.info(f"Output size: {output_shape[1]}x{output_shape[0]}")
-            
             # Explicitly free all large arrays to prevent RAM accumulation
             # Critical for batch processing to avoid memory bloat
-            del img, output, buffer
-            gc.collect()  # Force garbage collection
-            
-            return True
-            
+            del output
+
+            return success
+
+        except UpscaleCancelled as e:
+            logger.info(str(e))
+            return False
         except Exception as e:
             logger.error(f"Upscaling failed: {e}", exc_info=True)
             return False
+
+    def upscale_batch(
+        self,
+        pairs: list[tuple[str | Path, str | Path]],
+        outscale: float = 4.0,
+    ) -> list[bool]:
+        """Upscale many images, overlapping decoding and encoding with inference.
+
+        Upcoming images are decoded on background threads and finished
+        outputs are encoded and written on another, so the model only waits
+        on disk and codecs when they are slower than inference.
+
+        Args:
+            pairs: (input path, output path) for each image
+            outscale: Output scale factor (default: 4.0)
+
+        Returns:
+            Per-image success flags, in input order
+        """
+        results = [False] * len(pairs)
+        failed_dirs = self._make_output_dirs([output_path for _, output_path in pairs])
+        with ThreadPoolExecutor(max_workers=2) as decoder, ThreadPoolExecutor(max_workers=1) as encoder:
+            decodes: deque[Future] = deque(
+                decoder.submit(self.read_images, [input_path]) for input_path, _ in pairs[:PREFETCH_DEPTH]
+            )
+            pending_write: Optional[tuple[int, Future]] = None
+
+            for index, (input_path, output_path) in enumerate(pairs):
+                [img] = decodes.popleft().result()
+                if index + PREFETCH_DEPTH < len(pairs):
+                    decodes.append(decoder.submit(self.read_images, [pairs[index + PREFETCH_DEPTH][0]]))
+                if img is None or Path(output_path).parent in failed_dirs:
+                    continue
+
+                try:
+                    output = self._upscale_array(img, outscale)
+                except UpscaleCancelled as e:
+                    logger.info(str(e))
+                    break
+                except Exception as e:
+                    logger.error(f"Upscaling failed for {input_path}: {e}", exc_info=True)
+                    continue
+                del img
+
+                # Keep at most one output waiting on the encoder to bound memory
+                if pending_write is not None:
+                    write_index, write = pending_write
+                    results[write_index] = write.result()
+                pending_write = index, encoder.submit(self._save_output, Path(output_path), output)
+                del output
+
+            if pending_write is not None:
+                write_index, write = pending_write
+                results[write_index] = write.result()
+
+        self.release_memory()
+        return results
+
+    def _upscale_array(self, img: np.ndarray, outscale: float) -> np.ndarray:
+        """Run the upsampler on a decoded image and return the upscaled array."""
+        self._load_upsampler()
+        self._set_cudnn_benchmark()
+
+        original_shape = img.shape[:2]
+        logger.info(f"Original input image size: {original_shape[1]}x{original_shape[0]}")
+        logger.info(f"Starting upscaling with scale: {outscale}x")
+
+        # Upscale, undoing any tile size an OOM retry shrank for an earlier image
+        if self.tile == AUTO_TILE:
+            self.upsampler.tile_size = self._auto_tile_size(*original_shape)
+            logger.info(f"Auto tile size: {self.upsampler.tile_size or 'whole image'}")
+        else:
+            self.upsampler.tile_size = self.tile
+        self.upsampler.tile_batch_size = self._tile_batch_size()
+        self.upsampler.is_cancelled = self.is_cancelled
+        try:
+            output = self._enhance(img, outscale)
+        finally:
+            self.upsampler.release()
+        self._count_images(1)
+
+        return output
+
+    def _count_images(self, count: int) -> None:
+        """Count upscaled images and flush cached memory every MEMORY_FLUSH_INTERVAL.
+
+        empty_cache synchronizes the device and gc.collect scans the whole
+        heap, so doing both per image costs more than small images take to
+        upscale; the caching allocator reuses freed blocks in between.
+        """
+        previous = self._images_processed
+        self._images_processed += count
+        if self._images_processed // MEMORY_FLUSH_INTERVAL != previous // MEMORY_FLUSH_INTERVAL:
+            self.release_memory()
+
+    def release_memory(self) -> None:
+        """Drop the pooled output buffer and return cached memory, keeping the model loaded.
+
+        Called at the end of each job, so a long-lived upscaler doesn't hold
+        the output buffer of its largest image while idle; that memory would
+        also count as used when sizing later tiles and batches.
+        """
+        if self.upsampler is not None:
+            self.upsampler.release(keep_pool=False)
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        gc.collect()
+
+    @staticmethod
+    def _make_output_dirs(output_paths: list[str | Path]) -> set[Path]:
+        """Create each distinct output directory once, returning the ones that failed."""
+        failed_dirs = set()
+        for directory in {Path(output_path).parent for output_path in output_paths}:
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Failed to create output directory {directory}: {e}")
+                failed_dirs.add(directory)
+        return failed_dirs
+
+    def _save_output(self, output_path: Path, output: np.ndarray) -> bool:
+        """Write an upscaled image and log the result."""
+        try:
+            if not self._write_image(output_path, output):
+                return False
+        except Exception as e:
+            logger.error(f"Failed to save {output_path}: {e}")
+            return False
+
+        output_shape = output.shape[:2]
+        logger.info(f"✓ Upscaled image saved: {output_path}")
+        logger.info(f"Output size: {output_shape[1]}x{output_shape[0]}")
+        return True
+
+    def upscale_tensor_batch(self, batch: torch.Tensor) -> torch.Tensor:
+        """Run the model on an NCHW RGB batch in [0, 1] in one untiled pass.
+
+        Returns:
+            The batch upscaled by the model's native scale, as float32
+        """
+        self._load_upsampler()
+        scale = self.model_config["scale"]
+
+        if self.upsampler.half:
+            batch = batch.half()
+        if self.pre_pad != 0:
+            batch = F.pad(batch, (0, self.pre_pad, 0, self.pre_pad), "reflect")
+
+        with torch.inference_mode():
+            output = self.upsampler.model(batch)
+
+        if self.pre_pad != 0:
+            _, _, height, width = output.shape
+            output = output[:, :, : height - self.pre_pad * scale, : width - self.pre_pad * scale]
+        return output.float()
+
+    def upscale_many(
+        self,
+        input_paths: list[str | Path],
+        output_paths: list[str | Path],
+        outscale: float = 4.0,
+        images: Optional[list[Optional[np.ndarray]]] = None,
+    ) -> list[bool]:
+        """Upscale same-size images with a single batched forward pass.
+
+        Images that are not 8-bit 3-channel, or a batch that runs out of VRAM,
+        fall back to upscaling one image at a time.
+
+        Args:
+            input_paths: Paths to input images, all with the same dimensions
+            output_paths: Paths to save the upscaled images
+            outscale: Output scale factor (default: 4.0)
+            images: Already decoded images as returned by read_images, so
+                decoding can happen ahead of time on another thread
+
+        Returns:
+            Per-image success flags, in input order
+        """
+        output_paths = [Path(path) for path in output_paths]
+        failed_dirs = self._make_output_dirs(output_paths)
+        if images is None:
+            images = self.read_images(input_paths)
+        if failed_dirs:
+            # Images that can't be saved are left out, so they stay marked as failed
+            images = [
+                None if path.parent in failed_dirs else img
+                for path, img in zip(output_paths, images, strict=True)
+            ]
+
+        batchable = [
+            index for index, img in enumerate(images)
+            if img is not None and img.dtype == np.uint8 and img.ndim == 3 and img.shape[2] == 3
+        ]
+        if len(batchable) < 2 or any(images[index].shape != images[batchable[0]].shape for index in batchable):
+            batchable = []
+
+        results = [False] * len(images)
+        for index, img in enumerate(images):
+            if img is not None and index not in batchable:
+                results[index] = self.upscale_image(img, output_paths[index], outscale=outscale)
+
+        if not batchable:
+            return results
+
+        batch = output = None
+        out_of_memory = False
+        try:
+            self._load_upsampler()
+            height, width = images[batchable[0]].shape[:2]
+            logger.info(f"Upscaling a batch of {len(batchable)} images of size {width}x{height}")
+
+            # NHWC BGR uint8 -> NCHW RGB float in [0, 1], converted on the device
+            batch = torch.from_numpy(np.stack([images[index] for index in batchable]))
+            if self.upsampler.device.type == "cuda":
+                batch = batch.pin_memory()  # DMA copy, see _TiledRealESRGANer.pre_process
+            batch = batch.to(self.upsampler.device, non_blocking=True).permute(0, 3, 1, 2).flip(1).float().div_(255.0)
+            output = self.upscale_tensor_batch(batch)
+            batch = None
+            self._count_images(len(batchable))
+            outputs = output.clamp(0, 1).mul_(255.0).round_().byte().flip(1).permute(0, 2, 3, 1).cpu().numpy()
+            del output
+        except torch.cuda.OutOfMemoryError:
+            out_of_memory = True
+        except Exception as e:
+            logger.error(f"Batch upscaling failed: {e}", exc_info=True)
+            return results
+
+        if out_of_memory:
+            # Fall back only after leaving the except, whose traceback kept the
+            # batch, the output and the activations alive, so empty_cache can return them
+            del batch, output
+            torch.cuda.empty_cache()
+            logger.warning(f"Out of VRAM for a batch of {len(batchable)}, upscaling one at a time")
+            for index in batchable:
+                results[index] = self.upscale_image(images[index], output_paths[index], outscale=outscale)
+            return results
+
+        for index, output_image in zip(batchable, outputs, strict=True):
+            if outscale != float(self.model_config["scale"]):
+                output_image = cv2.resize(
+                    output_image,
+                    (int(width * outscale), int(height * outscale)),
+                    interpolation=cv2.INTER_LANCZOS4,
+                )
+            results[index] = self._write_image(output_paths[index], output_image)
+            if results[index]:
+                logger.info(f"✓ Upscaled image saved: {output_paths[index]}")
+
+        del outputs
+        return results
+
+    @staticmethod
+    def read_image(input_path: str | Path) -> Optional[np.ndarray]:
+        """Decode an image file, returning None if it cannot be decoded.
+
+        JPEGs are decoded with libjpeg-turbo when PyTurboJPEG is installed.
+        """
+        turbojpeg = _get_turbojpeg() if Path(input_path).suffix.lower() in (".jpg", ".jpeg") else None
+        if turbojpeg is not None:
+            with open(input_path, "rb") as f:
+                data = f.read()
+            try:
+                if turbojpeg.decode_header(data)[2] == TJSAMP_GRAY:
+                    # Keep grayscale 2-D, like cv2.imdecode with IMREAD_UNCHANGED
+                    return turbojpeg.decode(data, pixel_format=TJPF_GRAY).squeeze(axis=2)
+                return turbojpeg.decode(data, pixel_format=TJPF_BGR)
+            except OSError:
+                # Unusual JPEGs (CMYK, arithmetic coding) fall back to OpenCV
+                return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+        # np.fromfile + imdecode handles non-ASCII paths
+        img_buffer = np.fromfile(str(input_path), dtype=np.uint8)
+        return cv2.imdecode(img_buffer, cv2.IMREAD_UNCHANGED)
+
+    @classmethod
+    def read_images(cls, input_paths: list[str | Path]) -> list[Optional[np.ndarray]]:
+        """Decode several image files, logging and returning None for any that fail."""
+        images = []
+        for input_path in input_paths:
+            try:
+                img = cls.read_image(input_path)
+            except Exception as e:
+                logger.error(f"Failed to read image {input_path}: {e}")
+                img = None
+            else:
+                if img is None:
+                    logger.error(f"Failed to load image: {input_path}")
+            images.append(img)
+        return images
+
+    @staticmethod
+    def _write_image(output_path: Path, output: np.ndarray) -> bool:
+        """Encode and save an image, writing straight to disk where possible.
+
+        Encoding into memory first would hold the whole encoded file in RAM
+        next to the output array, which adds up for 4x outputs.
+        """
+        if str(output_path).isascii():
+            try:
+                if cv2.imwrite(str(output_path), output):
+                    return True
+            except cv2.error as e:
+                logger.error(f"Failed to encode output image {output_path}: {e}")
+                return False
+            logger.error(f"Failed to encode output image: {output_path}")
+            return False
+
+        # cv2.imwrite can't open non-ASCII paths on every platform, but PIL can
+        if output.dtype == np.uint8 and (output.ndim == 2 or output.shape[2] in (3, 4)):
+            # Read BGR(A) directly with a raw mode instead of making a color-converted copy
+            mode, raw_mode = {2: ("L", "L"), 3: ("RGB", "BGR"), 4: ("RGBA", "BGRA")}[
+                output.shape[2] if output.ndim == 3 else 2
+            ]
+            height, width = output.shape[:2]
+            options = PIL_SAVE_OPTIONS.get(output_path.suffix.lower(), {"quality": 95})
+            try:
+                image = Image.frombuffer(
+                    mode, (width, height), np.ascontiguousarray(output), "raw", raw_mode, 0, 1
+                )
+                image.save(output_path, **options)
+                return True
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to encode output image {output_path}: {e}")
+                return False
+
+        # imencode + tofile handles non-ASCII paths for everything else
+        is_success, buffer = cv2.imencode(output_path.suffix, output)
+        if not is_success:
+            logger.error(f"Failed to encode output image: {output_path}")
+            return False
+        buffer.tofile(str(output_path))
+        return True
     
     def cleanup(self) -> None:
         """Free GPU memory."""
         if self.upsampler is not None:
             del self.upsampler
             self.upsampler = None
+            self._warmed_up = False
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
+                torch.cuda.ipc_collect()
             logger.info("Upsampler cleaned up")
@@ -0,0 +1,73 @@
+"""Check that batched tile processing matches upstream Real-ESRGAN tile by tile."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+# Imported through the module, which installs the torchvision shim basicsr needs
+real_esrgan = pytest.importorskip("scripts.src.models.real_esrgan")
+
+from torch import nn
+
+RealESRGANer = real_esrgan.RealESRGANer
+UpscaleCancelled = real_esrgan.UpscaleCancelled
+_TiledRealESRGANer = real_esrgan._TiledRealESRGANer
+
+SCALE = 4
+TILE = 32
+TILE_PAD = 6
+
+
+class _StubModel(nn.Module):
+    """Tiny 4x model whose 3x3 conv makes each output depend on its tile's padding."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv = nn.Conv2d(3, 3 * SCALE * SCALE, 3, padding=1)
+        self.shuffle = nn.PixelShuffle(SCALE)
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        return self.shuffle(self.conv(x))
+
+
+def _make_upsampler(img: torch.Tensor, model: nn.Module, tile_batch_size: int = 1) -> _TiledRealESRGANer:
+    """Build an upsampler around the stub model without loading weights from disk."""
+    upsampler = object.__new__(_TiledRealESRGANer)
+    upsampler.scale = SCALE
+    upsampler.tile_size = TILE
+    upsampler.tile_pad = TILE_PAD
+    upsampler.model = model
+    upsampler.img = img
+    upsampler.tile_batch_size = tile_batch_size
+    return upsampler
+
+
+@pytest.fixture(scope="module")
+def model() -> nn.Module:
+    torch.manual_seed(0)
+    return _StubModel().eval()
+
+
+@pytest.mark.parametrize("height, width", [(64, 64), (150, 130), (97, 200)])
+@pytest.mark.parametrize("tile_batch_size", [1, 3, 16])
+def test_matches_upstream(model, height, width, tile_batch_size):
+    img = torch.rand(1, 3, height, width)
+
+    with torch.no_grad():
+        reference = _make_upsampler(img, model)
+        RealESRGANer.tile_process(reference)
+
+        upsampler = _make_upsampler(img, model, tile_batch_size)
+        upsampler.tile_process()
+
+    assert upsampler.output.shape == (1, 3, height * SCALE, width * SCALE)
+    torch.testing.assert_close(upsampler.output, reference.output)
+
+
+def test_cancelled_between_batches(model):
+    checks = []
+    upsampler = _make_upsampler(torch.rand(1, 3, 90, 77), model, tile_batch_size=3)
+    upsampler.is_cancelled = lambda: checks.append(None) or len(checks) == 2
+
+    with torch.no_grad(), pytest.raises(UpscaleCancelled):
+        upsampler.tile_process()
+    assert len(checks) == 2